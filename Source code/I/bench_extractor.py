@@ -0,0 +1,102 @@
+import argparse
+import glob
+import os
+import time
+
+import bs4
+
+from extractor import PARSER, parse_squad_page
+from schema import table_ids, data_stats
+
+
+def legacy_parse(content, team_name):
+    # The per-cell soup.find implementation that I.py used before extractor.py
+    soup = bs4.BeautifulSoup(content, 'html.parser')
+    table = soup.find('div', id=table_ids[0])
+    if not table:
+        return []
+    tbody = table.find('tbody')
+    players = {}
+    for tr in tbody.find_all('tr'):
+        th = tr.find('th')
+        name = th.get_text()
+        td = tr.find('td', {'data-stat': 'minutes_90s'})
+        minutes_90s = float('0' + td.get_text()) if td else 0
+        if minutes_90s > 1:
+            players[name] = [name]
+
+    for table_id, dstats in zip(table_ids, data_stats):
+        visited = set()
+        table = soup.find('div', id=table_id)
+        if not table:
+            continue
+        tbody = table.find('tbody')
+        if not tbody:
+            continue
+        for tr in tbody.find_all('tr'):
+            th = tr.find('th')
+            name = th.get_text()
+            if name not in players:
+                continue
+            visited.add(name)
+            for dstat in dstats:
+                if dstat == 'nationality':
+                    td = tr.find('td', {'data-stat': dstat})
+                    if td:
+                        if td.find('a'):
+                            nation = td.find('a').get_text().split()[1]
+                        else:
+                            nation = 'N/a'
+                        players[name].append(nation)
+                        players[name].append(team_name)
+                else:
+                    td = tr.find('td', {'data-stat': dstat})
+                    value = 'N/a' if td.get_text() == '' else td.get_text()
+                    players[name].append(value)
+        for name in players:
+            if name not in visited:
+                players[name].extend(['N/a'] * len(dstats))
+    return list(players.values())
+
+
+def time_it(fn, pages, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for content, team_name in pages:
+            fn(content, team_name)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare the legacy and single-pass squad page parsers')
+    parser.add_argument('pages', nargs='*', help='saved squad pages (default: I/cache/*.html)')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    paths = args.pages or sorted(glob.glob('I/cache/*.html'))
+    pages = []
+    for path in paths:
+        with open(path, 'rb') as f:
+            content = f.read()
+        if table_ids[0].encode() in content:
+            pages.append((content, os.path.splitext(os.path.basename(path))[0]))
+    if not pages:
+        print("No saved squad pages found.")
+        return
+
+    for content, team_name in pages:
+        if legacy_parse(content, team_name) != parse_squad_page(content, team_name, table_ids, data_stats):
+            print(f"WARNING: parsers disagree on {team_name}")
+
+    legacy = time_it(legacy_parse, pages, args.repeat)
+    fast = time_it(lambda c, t: parse_squad_page(c, t, table_ids, data_stats), pages, args.repeat)
+    print(f"Pages: {len(pages)}")
+    print(f"Legacy soup.find per cell: {legacy / len(pages) * 1000:.1f} ms/page")
+    print(f"Single-pass ({PARSER}):   {fast / len(pages) * 1000:.1f} ms/page")
+    print(f"Speedup: {legacy / fast:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+import hashlib
+import json
+import os
+import time
+import threading
+
+
+class CachedResponse:
+    def __init__(self, url, content, headers=None, status_code=200):
+        self.url = url
+        self.content = content
+        self.headers = headers or {}
+        self.status_code = status_code
+        self.from_cache = True
+
+
+class ResponseCache:
+    def __init__(self, folder='I/cache'):
+        self.folder = folder
+        self.lock = threading.Lock()
+        os.makedirs(folder, exist_ok=True)
+
+    def key(self, url):
+        return hashlib.sha1(url.encode('utf-8')).hexdigest()
+
+    def paths(self, url):
+        key = self.key(url)
+        return os.path.join(self.folder, key + '.html'), os.path.join(self.folder, key + '.json')
+
+    def meta(self, url):
+        _, meta_path = self.paths(url)
+        if not os.path.exists(meta_path):
+            return None
+        with open(meta_path, encoding='utf-8') as f:
+            return json.load(f)
+
+    def get(self, url):
+        body_path, _ = self.paths(url)
+        meta = self.meta(url)
+        if meta is None or not os.path.exists(body_path):
+            return None
+        with open(body_path, 'rb') as f:
+            content = f.read()
+        headers = {}
+        if meta.get('etag'):
+            headers['ETag'] = meta['etag']
+        if meta.get('last_modified'):
+            headers['Last-Modified'] = meta['last_modified']
+        return CachedResponse(url, content, headers)
+
+    def conditional_headers(self, url):
+        meta = self.meta(url)
+        headers = {}
+        if meta:
+            if meta.get('etag'):
+                headers['If-None-Match'] = meta['etag']
+            if meta.get('last_modified'):
+                headers['If-Modified-Since'] = meta['last_modified']
+        return headers
+
+    def store(self, url, response):
+        body_path, meta_path = self.paths(url)
+        meta = {
+            'url': url,
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'fetched_at': time.time(),
+        }
+        with self.lock:
+            # Write to temp files first so a crash never leaves a torn entry
+            with open(body_path + '.tmp', 'wb') as f:
+                f.write(response.content)
+            with open(meta_path + '.tmp', 'w', encoding='utf-8') as f:
+                json.dump(meta, f)
+            os.replace(body_path + '.tmp', body_path)
+            os.replace(meta_path + '.tmp', meta_path)
+
+    def touch(self, url):
+        _, meta_path = self.paths(url)
+        meta = self.meta(url)
+        if meta is None:
+            return
+        meta['fetched_at'] = time.time()
+        with self.lock:
+            with open(meta_path + '.tmp', 'w', encoding='utf-8') as f:
+                json.dump(meta, f)
+            os.replace(meta_path + '.tmp', meta_path)
+
+    def urls(self):
+        for name in sorted(os.listdir(self.folder)):
+            if name.endswith('.json'):
+                with open(os.path.join(self.folder, name), encoding='utf-8') as f:
+                    yield json.load(f)['url']
@@ -0,0 +1,129 @@
+import argparse
+import csv
+import os
+
+import bs4
+import pandas as pd
+
+from fetcher import Fetcher
+from cache import ResponseCache
+from extractor import parse_squad_page
+from pipeline import run_pipeline
+from loader import write_typed
+from telemetry import metrics, export
+from schema import COMPETITIONS, table_ids_for, results_div_id, data_stats, columns
+
+BASE_URL = 'https://fbref.com'
+
+
+def competition_url(league, season, base_url=BASE_URL):
+    comp_id = COMPETITIONS[league]
+    return f"{base_url}/en/comps/{comp_id}/{season}/{season}-{league}-Stats"
+
+
+def parse_competition_page(content, league, season, base_url=BASE_URL):
+    div_id = results_div_id(season, COMPETITIONS[league])
+    soup = bs4.BeautifulSoup(content, 'html.parser', parse_only=bs4.SoupStrainer('div', id=div_id))
+    squads = []
+    for td in soup.find_all('td', {'data-stat': 'team'}):
+        a = td.find('a')
+        if a and 'href' in a.attrs:
+            squads.append((base_url + a['href'], td.get_text()))
+    return squads
+
+
+def discover_squads(fetcher, leagues, seasons, base_url=BASE_URL, workers=4):
+    pages = {competition_url(league, season, base_url): (league, season)
+             for league in leagues for season in seasons}
+    jobs = []
+    for url, response in fetcher.fetch_many(pages, max_workers=workers):
+        league, season = pages[url]
+        if response is None or response.status_code != 200:
+            print(f"Could not load {league} {season}")
+            continue
+        squads = parse_competition_page(response.content, league, season, base_url)
+        print(f"{league} {season}: {len(squads)} squads")
+        for squad_url, team_name in squads:
+            jobs.append((squad_url, (league, season, team_name)))
+    return jobs
+
+
+def parse_job(content, context):
+    league, season, team_name = context
+    return parse_squad_page(content, team_name, table_ids_for(COMPETITIONS[league]), data_stats)
+
+
+def partition_path(root, league, season):
+    return os.path.join(root, f'league={league}', f'season={season}', 'results.csv')
+
+
+class PartitionWriter:
+    # Streams rows into one CSV per league/season as they arrive, then sorts
+    # each partition and writes its typed copies on close
+    def __init__(self, root):
+        self.root = root
+        self.files = {}
+
+    def write(self, context, rows):
+        league, season, team_name = context
+        print(f"Processing team: {team_name} ({league} {season})")
+        metrics.inc('rows_emitted', len(rows), league=league, season=season, team=team_name)
+        key = (league, season)
+        if key not in self.files:
+            path = partition_path(self.root, league, season)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            f = open(path, 'w', newline='', encoding='utf-8')
+            writer = csv.writer(f)
+            writer.writerow(columns)
+            self.files[key] = (f, writer)
+        self.files[key][1].writerows(rows)
+
+    def close(self):
+        for (league, season), (f, _) in self.files.items():
+            f.close()
+            path = partition_path(self.root, league, season)
+            df = pd.read_csv(path, dtype=str, keep_default_na=False).sort_values('Player')
+            df.to_csv(path, index=False)
+            write_typed(df, path)
+        return sorted(self.files)
+
+
+def crawl(leagues, seasons, fetcher, output_root='I/data', base_url=BASE_URL,
+          fetch_workers=4, parse_workers=2, queue_size=8):
+    jobs = discover_squads(fetcher, leagues, seasons, base_url, fetch_workers)
+    print(f"Total squads to process: {len(jobs)}")
+    writer = PartitionWriter(output_root)
+    run_pipeline(jobs, fetcher, parse_job, writer.write, fetch_workers=fetch_workers,
+                 parse_workers=parse_workers, queue_size=queue_size)
+    return writer.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Crawl squad stats for several competitions and seasons')
+    parser.add_argument('--leagues', nargs='+', default=['Premier-League'], choices=sorted(COMPETITIONS))
+    parser.add_argument('--seasons', nargs='+', default=['2024-2025'], help='e.g. 2020-2021 2021-2022')
+    parser.add_argument('--output', default='I/data')
+    parser.add_argument('--workers', type=int, default=4, help='concurrent fetchers')
+    parser.add_argument('--parse-workers', type=int, default=2, help='parser processes')
+    parser.add_argument('--queue-size', type=int, default=8)
+    parser.add_argument('--rate', type=float, default=10 / 60, help='requests per second per host')
+    parser.add_argument('--cache-dir', default='I/cache')
+    parser.add_argument('--no-cache', action='store_true')
+    parser.add_argument('--offline', action='store_true')
+    parser.add_argument('--metrics-dir', default='I')
+    parser.add_argument('--base-url', default=BASE_URL, help='e.g. a local fixture_server.py')
+    args = parser.parse_args()
+
+    cache = None if args.no_cache else ResponseCache(args.cache_dir)
+    fetcher = Fetcher(rate=args.rate, pool_size=args.workers, cache=cache, offline=args.offline)
+    partitions = crawl(args.leagues, args.seasons, fetcher, args.output, args.base_url.rstrip('/'),
+                       fetch_workers=args.workers, parse_workers=args.parse_workers,
+                       queue_size=args.queue_size)
+    fetcher.close()
+    for league, season in partitions:
+        print(f"Saved {partition_path(args.output, league, season)}")
+    export(args.metrics_dir, prefix='crawl', leagues=args.leagues, seasons=args.seasons)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+from bs4 import BeautifulSoup, SoupStrainer
+
+from telemetry import metrics
+
+try:
+    import lxml.html
+    PARSER = 'lxml'
+except ImportError:
+    PARSER = 'html.parser'
+
+
+def extract_tables(content, table_ids):
+    # {table_id: {player: {data-stat: text}}}, walking every row's cells once
+    if PARSER == 'lxml':
+        return extract_tables_lxml(content, table_ids)
+    return extract_tables_soup(content, table_ids)
+
+
+def extract_tables_lxml(content, table_ids):
+    # fbref serves UTF-8; don't let lxml fall back to latin-1 guessing on bytes
+    parser = lxml.html.HTMLParser(encoding='utf-8') if isinstance(content, bytes) else None
+    with metrics.timer('parse_document', parser='lxml'):
+        root = lxml.html.fromstring(content, parser=parser)
+    tables = {}
+    for table_id in table_ids:
+        with metrics.timer('parse_table', table_id=table_id):
+            divs = root.xpath('//div[@id=$id]', id=table_id)
+            if not divs:
+                continue
+            tbodies = divs[0].xpath('.//tbody')
+            if not tbodies:
+                continue
+            rows = {}
+            for tr in tbodies[0].iterchildren('tr'):
+                th = tr.find('th')
+                if th is None:
+                    continue
+                cells = {}
+                for td in tr.iterchildren('td'):
+                    stat = td.get('data-stat')
+                    if stat:
+                        cells[stat] = td.text_content()
+                rows[th.text_content()] = cells
+            tables[table_id] = rows
+    return tables
+
+
+def extract_tables_soup(content, table_ids):
+    # Without lxml, only build the soup for the stat table divs
+    wanted = set(table_ids)
+    strainer = SoupStrainer('div', id=lambda value: value in wanted)
+    with metrics.timer('parse_document', parser=PARSER):
+        soup = BeautifulSoup(content, PARSER, parse_only=strainer)
+
+    tables = {}
+    for div in soup.find_all('div', id=lambda value: value in wanted):
+        with metrics.timer('parse_table', table_id=div['id']):
+            tbody = div.find('tbody')
+            if not tbody:
+                continue
+            rows = {}
+            for tr in tbody.find_all('tr'):
+                th = tr.find('th')
+                if th is None:
+                    continue
+                cells = {}
+                for td in tr.find_all('td'):
+                    stat = td.get('data-stat')
+                    if stat:
+                        cells[stat] = td.get_text()
+                rows[th.get_text()] = cells
+            tables[div['id']] = rows
+    return tables
+
+
+def build_rows(tables, team_name, table_ids, data_stats):
+    standard = tables.get(table_ids[0], {})
+    players = {}
+    for name, cells in standard.items():
+        minutes_90s = float('0' + cells.get('minutes_90s', ''))
+        if minutes_90s > 1:
+            players[name] = [name]
+
+    for table_id, dstats in zip(table_ids, data_stats):
+        rows = tables.get(table_id, {})
+        for name, values in players.items():
+            cells = rows.get(name)
+            for dstat in dstats:
+                text = cells.get(dstat, '') if cells is not None else ''
+                if dstat == 'nationality':
+                    # The cell reads like "eng ENG"; keep the upper-case code
+                    parts = text.split()
+                    values.append(parts[-1] if parts else 'N/a')
+                    values.append(team_name)
+                else:
+                    values.append(text if text != '' else 'N/a')
+    return list(players.values())
+
+
+def parse_squad_page(content, team_name, table_ids, data_stats):
+    tables = extract_tables(content, table_ids)
+    return build_rows(tables, team_name, table_ids, data_stats)
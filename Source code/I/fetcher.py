@@ -0,0 +1,146 @@
+import threading
+import time
+import random
+import concurrent.futures
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from telemetry import metrics
+
+# fbref allows roughly 10 requests per minute per client before answering 429
+DEFAULT_RATE = 10 / 60
+DEFAULT_BURST = 2
+MAX_ATTEMPTS = 5
+USER_AGENT = 'Mozilla/5.0 (X11; Linux x86_64) Python-Assignment scraper'
+
+
+class TokenBucket:
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        # Returns the number of seconds spent waiting for a token
+        waited = 0.0
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                delay = (1 - self.tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+    def pause(self, seconds):
+        # Drain the bucket so every worker on this host waits out a Retry-After
+        with self.lock:
+            self.tokens = min(self.tokens, 0) - seconds * self.rate
+
+
+def retry_after_seconds(response, attempt):
+    value = response.headers.get('Retry-After')
+    if value:
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            try:
+                return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+            except (TypeError, ValueError):
+                pass
+    # No usable header: exponential backoff with jitter
+    return backoff_seconds(attempt)
+
+
+def backoff_seconds(attempt):
+    return min(120.0, 2 ** attempt * 5) + random.uniform(0, 1)
+
+
+class Fetcher:
+    def __init__(self, rate=DEFAULT_RATE, burst=DEFAULT_BURST, pool_size=10, timeout=30,
+                 cache=None, offline=False):
+        self.rate = rate
+        self.burst = burst
+        self.timeout = timeout
+        self.cache = cache
+        self.offline = offline
+        self.session = requests.Session()
+        self.session.headers['User-Agent'] = USER_AGENT
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.buckets = {}
+        self.buckets_lock = threading.Lock()
+
+    def bucket_for(self, url):
+        host = urlsplit(url).netloc
+        with self.buckets_lock:
+            if host not in self.buckets:
+                self.buckets[host] = TokenBucket(self.rate, self.burst)
+            return self.buckets[host]
+
+    def get(self, url):
+        host = urlsplit(url).netloc
+        if self.offline:
+            cached = self.cache.get(url) if self.cache else None
+            if cached is None:
+                print(f"Not in cache (offline mode): {url}")
+            else:
+                metrics.inc('cache_hits', host=host)
+            return cached
+        headers = self.cache.conditional_headers(url) if self.cache else {}
+        bucket = self.bucket_for(url)
+        for attempt in range(MAX_ATTEMPTS):
+            if attempt:
+                metrics.inc('retries', host=host)
+            metrics.inc('sleep_seconds', bucket.acquire(), host=host)
+            try:
+                with metrics.timer('request', host=host):
+                    response = self.session.get(url, headers=headers, timeout=self.timeout)
+            except requests.RequestException as e:
+                # Connection errors and timeouts are retried like a 429; once
+                # the attempts run out the caller gets None, as for any failure
+                metrics.inc('request_errors', host=host, error=type(e).__name__)
+                if attempt + 1 < MAX_ATTEMPTS:
+                    wait = backoff_seconds(attempt)
+                    print(f"Request failed ({type(e).__name__}). Retrying in {wait:.0f}s...")
+                    time.sleep(wait)
+                    metrics.inc('sleep_seconds', wait, host=host)
+                continue
+            metrics.inc('requests', host=host, status=response.status_code)
+            metrics.inc('bytes_downloaded', len(response.content), host=host)
+            if response.status_code == 304 and self.cache:
+                metrics.inc('cache_hits', host=host)
+                self.cache.touch(url)
+                return self.cache.get(url)
+            if response.status_code == 429:
+                metrics.inc('rate_limited', host=host)
+                wait = retry_after_seconds(response, attempt)
+                print(f"Rate limited. Waiting {wait:.0f}s before retrying...")
+                bucket.pause(wait)
+                continue
+            response.from_cache = False
+            if self.cache and response.status_code == 200:
+                self.cache.store(url, response)
+            return response
+        print(f"Giving up after {MAX_ATTEMPTS} attempts: {url}")
+        metrics.inc('failed_requests', host=host)
+        return None
+
+    def fetch_many(self, urls, max_workers=4):
+        # Yields (url, response) in completion order over the shared session
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(self.get, url): url for url in urls}
+            for future in concurrent.futures.as_completed(futures):
+                yield futures[future], future.result()
+
+    def close(self):
+        self.session.close()
@@ -0,0 +1,178 @@
+import argparse
+import copy
+import hashlib
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, unquote
+
+import lxml.html
+
+from cache import ResponseCache
+
+# Recorded pages live at <root>/<url path>, so fbref (/en/...) and
+# footballtransfers (/us/...) recordings can be served side by side.
+
+
+def fixture_path(root, url_path):
+    path = unquote(urlsplit(url_path).path).lstrip('/')
+    if path == '' or path.endswith('/'):
+        path += 'index.html'
+    root = os.path.abspath(root)
+    full = os.path.normpath(os.path.join(root, path))
+    # commonpath, not startswith: "root_evil/..." shares root's prefix
+    if os.path.commonpath([full, root]) != root:
+        return None
+    return full
+
+
+def record_from_cache(cache_dir, root):
+    # Copy every page in the scraper's response cache into the fixture layout
+    cache = ResponseCache(cache_dir)
+    count = 0
+    for url in cache.urls():
+        path = fixture_path(root, url)
+        response = cache.get(url)
+        if path is None or response is None:
+            continue
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(response.content)
+        count += 1
+    return count
+
+
+def scale_page(content, rows_scale=1, teams_scale=1):
+    # Synthetic load: repeat every stat table row (renamed) rows_scale times and
+    # every team link teams_scale times (with ?copy=n so each is a new URL)
+    if rows_scale <= 1 and teams_scale <= 1:
+        return content
+    root = lxml.html.fromstring(content, parser=lxml.html.HTMLParser(encoding='utf-8'))
+    if rows_scale > 1:
+        for tbody in root.xpath('//div[starts-with(@id, "div_stats_")]//tbody'):
+            rows = list(tbody.iterchildren('tr'))
+            for copy_idx in range(1, rows_scale):
+                for tr in rows:
+                    clone = copy.deepcopy(tr)
+                    th = clone.find('th')
+                    if th is not None:
+                        target = next(iter(th.iter('a')), th)
+                        target.text = f"{target.text or ''} #{copy_idx}"
+                    tbody.append(clone)
+    if teams_scale > 1:
+        for td in root.xpath('//td[@data-stat="team"]'):
+            tr = td.getparent()
+            for copy_idx in range(1, teams_scale):
+                clone = copy.deepcopy(tr)
+                for a in clone.xpath('.//td[@data-stat="team"]//a'):
+                    a.set('href', f"{a.get('href')}?copy={copy_idx}")
+                    a.text = f"{a.text or ''} {copy_idx}"
+                tr.addnext(clone)
+    return lxml.html.tostring(root, encoding='utf-8')
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    server_version = 'FixtureServer/1.0'
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def do_GET(self):
+        server = self.server
+        if server.latency:
+            time.sleep(random.uniform(0.5, 1.5) * server.latency)
+        if random.random() < server.rate_limit:
+            self.send_response(429)
+            self.send_header('Retry-After', str(server.retry_after))
+            self.end_headers()
+            return
+
+        content = server.load(self.path)
+        if content is None:
+            self.send_error(404)
+            return
+        etag = '"' + hashlib.sha1(content).hexdigest() + '"'
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(content)))
+        self.send_header('ETag', etag)
+        self.end_headers()
+        self.wfile.write(content)
+
+
+class FixtureServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, root, latency=0.0, rate_limit=0.0, retry_after=1,
+                 rows_scale=1, teams_scale=1, verbose=False):
+        super().__init__(address, FixtureHandler)
+        self.root = root
+        self.latency = latency
+        self.rate_limit = rate_limit
+        self.retry_after = retry_after
+        self.rows_scale = rows_scale
+        self.teams_scale = teams_scale
+        self.verbose = verbose
+        self.pages = {}
+        self.lock = threading.Lock()
+
+    def load(self, url_path):
+        path = fixture_path(self.root, url_path)
+        if path is None or not os.path.isfile(path):
+            return None
+        # Cached per file version, so an edited fixture is served without a restart
+        mtime = os.stat(path).st_mtime_ns
+        with self.lock:
+            cached = self.pages.get(path)
+            if cached is None or cached[0] != mtime:
+                with open(path, 'rb') as f:
+                    cached = (mtime, scale_page(f.read(), self.rows_scale, self.teams_scale))
+                self.pages[path] = cached
+            return cached[1]
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}'
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve recorded fbref/footballtransfers pages for offline scraper runs')
+    parser.add_argument('--root', default='I/fixtures', help='recorded pages, laid out by URL path')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--latency', type=float, default=0.0, help='mean seconds added to every response')
+    parser.add_argument('--rate-limit', type=float, default=0.0, help='fraction of requests answered with 429')
+    parser.add_argument('--retry-after', type=int, default=1)
+    parser.add_argument('--rows-scale', type=int, default=1, help='repeat every squad table row N times')
+    parser.add_argument('--teams-scale', type=int, default=1, help='repeat every team link N times')
+    parser.add_argument('--record-from-cache', metavar='CACHE_DIR', help='copy cached pages into --root and exit')
+    parser.add_argument('--verbose', action='store_true')
+    args = parser.parse_args()
+
+    if args.record_from_cache:
+        count = record_from_cache(args.record_from_cache, args.root)
+        print(f"Recorded {count} pages into {args.root}")
+        return
+
+    server = FixtureServer((args.host, args.port), args.root, args.latency, args.rate_limit,
+                           args.retry_after, args.rows_scale, args.teams_scale, args.verbose)
+    print(f"Serving {args.root} at {server.base_url} (use --base-url {server.base_url})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+import hashlib
+import json
+import os
+import time
+
+import pandas as pd
+
+from telemetry import metrics
+
+KEY = ['Player', 'Team']
+
+
+def load_manifest(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_manifest(manifest, path):
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    os.replace(path + '.tmp', path)
+
+
+def rows_hash(rows):
+    # Hash the extracted rows rather than the raw HTML, which carries ads
+    # and timestamps that change on every request
+    payload = json.dumps(rows, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def record(manifest, team_name, url, rows):
+    manifest[team_name] = {'url': url, 'fetched_at': time.time(), 'sha256': rows_hash(rows)}
+
+
+def upsert(existing, updated, teams):
+    # Replace the rows of the given teams with `updated`, keyed on (Player, Team)
+    in_teams = existing['Team'].isin(teams)
+    old = existing[in_teams].drop_duplicates(KEY, keep='last').set_index(KEY)
+    new = updated.drop_duplicates(KEY, keep='last').set_index(KEY)
+
+    added = new.index.difference(old.index)
+    removed = old.index.difference(new.index)
+    common = new.index.intersection(old.index)
+    differs = (old.loc[common, new.columns] != new.loc[common]).any(axis=1)
+    changed = common[differs.to_numpy()]
+
+    result = pd.concat([existing[~in_teams], updated], ignore_index=True)
+    result = result.sort_values('Player')
+    report = {
+        'added': [list(k) for k in added],
+        'changed': [list(k) for k in changed],
+        'removed': [list(k) for k in removed],
+    }
+    return result, report
+
+
+def print_report(report):
+    for kind in ('added', 'changed', 'removed'):
+        print(f"{kind.capitalize()}: {len(report[kind])}")
+        for player, team in report[kind]:
+            print(f"  {player} ({team})")
+
+
+def run_incremental(teams, fetcher, parse, columns, output_file, manifest, max_age=0, workers=4):
+    # Re-scrape squads whose manifest entry is older than max_age seconds and
+    # upsert the ones whose extracted rows changed into output_file
+    now = time.time()
+    urls = {url: team_name for url, team_name in teams
+            if now - manifest.get(team_name, {}).get('fetched_at', 0) >= max_age}
+    print(f"Checking {len(urls)} of {len(teams)} squads")
+
+    changed = {}
+    for url, response in fetcher.fetch_many(urls, max_workers=workers):
+        team_name = urls[url]
+        if response is None or response.status_code != 200:
+            continue
+        with metrics.timer('stage', stage='parse'):
+            rows = parse(response.content, team_name)
+        metrics.inc('rows_emitted', len(rows), team=team_name)
+        previous = manifest.get(team_name, {}).get('sha256')
+        record(manifest, team_name, url, rows)
+        if manifest[team_name]['sha256'] != previous:
+            print(f"Changed team: {team_name}")
+            changed[team_name] = rows
+
+    # Read everything as text so untouched rows are written back byte for byte
+    existing = pd.read_csv(output_file, dtype=str, keep_default_na=False)
+    updated = pd.DataFrame([row for rows in changed.values() for row in rows], columns=columns)
+    df, report = upsert(existing, updated, set(changed))
+    df.to_csv(output_file, index=False)
+    return df, report
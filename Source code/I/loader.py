@@ -0,0 +1,107 @@
+import glob
+import os
+
+import pandas as pd
+
+from schema import column_dtypes
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+NA_VALUES = ['N/a', '']
+
+
+def coerce_players(df):
+    # Turn the scraper's text output ('N/a', "1,234") into typed columns.
+    # Columns the schema does not know about (e.g. Transfer Fee) are left alone.
+    df = df.replace('N/a', pd.NA)
+    for column, dtype in column_dtypes().items():
+        if column not in df.columns or str(df[column].dtype) == dtype:
+            continue
+        if dtype == 'string':
+            df[column] = df[column].astype('string')
+        else:
+            values = df[column].astype('string').str.replace(',', '', regex=False)
+            df[column] = pd.to_numeric(values, errors='coerce').astype(dtype)
+    return df
+
+
+def read_csv_typed(path):
+    df = pd.read_csv(path, dtype=str, na_values=NA_VALUES, keep_default_na=False)
+    return coerce_players(df)
+
+
+def typed_paths(csv_path):
+    base = os.path.splitext(csv_path)[0]
+    return base + '.parquet', base + '.arrow'
+
+
+def write_typed(df, csv_path):
+    # Parquet for interchange, plus an uncompressed Arrow IPC file that
+    # load_table() can map without decoding
+    if pa is None:
+        return
+    df = coerce_players(df).reset_index(drop=True)
+    parquet_path, arrow_path = typed_paths(csv_path)
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    pq.write_table(table, parquet_path)
+    with pa.OSFile(arrow_path, 'wb') as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+
+def is_fresh(typed_path, csv_path):
+    if not os.path.exists(typed_path):
+        return False
+    return not os.path.exists(csv_path) or os.path.getmtime(typed_path) >= os.path.getmtime(csv_path)
+
+
+def load_table(csv_path='I/results.csv'):
+    # Zero-copy pyarrow.Table backed by the memory-mapped Arrow file
+    _, arrow_path = typed_paths(csv_path)
+    source = pa.memory_map(arrow_path, 'r')
+    return pa.ipc.open_file(source).read_all()
+
+
+def load_players(csv_path='I/results.csv', memory_map=False):
+    # Typed player table; uses the columnar files written next to the CSV
+    # when they are at least as new, otherwise parses and coerces the CSV.
+    # memory_map=True reads the Arrow file through a memory map (no parsing
+    # or decompression), but to_pandas() still copies it into pandas; callers
+    # that need to stay zero-copy should use load_table() instead.
+    if pa is not None:
+        parquet_path, arrow_path = typed_paths(csv_path)
+        if memory_map and is_fresh(arrow_path, csv_path):
+            return load_table(csv_path).to_pandas()
+        if is_fresh(parquet_path, csv_path):
+            return pd.read_parquet(parquet_path)
+    return read_csv_typed(csv_path)
+
+
+def partition_paths(root='I/data', leagues=None, seasons=None):
+    # CSV partitions written by crawl.py as league=<name>/season=<season>/results.csv
+    paths = []
+    for path in sorted(glob.glob(os.path.join(root, 'league=*', 'season=*', 'results.csv'))):
+        season_dir = os.path.dirname(path)
+        league = os.path.basename(os.path.dirname(season_dir)).split('=', 1)[1]
+        season = os.path.basename(season_dir).split('=', 1)[1]
+        if (leagues is None or league in leagues) and (seasons is None or season in seasons):
+            paths.append((league, season, path))
+    return paths
+
+
+def load_partitions(root='I/data', leagues=None, seasons=None, memory_map=False):
+    frames = []
+    for league, season, path in partition_paths(root, leagues, seasons):
+        df = load_players(path, memory_map=memory_map)
+        df['League'] = league
+        df['Season'] = season
+        frames.append(df)
+    if not frames:
+        # No partition matched: an empty table with the usual columns and dtypes
+        dtypes = dict(column_dtypes(), League=str, Season=str)
+        return pd.DataFrame({column: pd.Series(dtype=dtype) for column, dtype in dtypes.items()})
+    return pd.concat(frames, ignore_index=True)
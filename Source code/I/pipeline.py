@@ -0,0 +1,91 @@
+import queue
+import threading
+import concurrent.futures
+
+from telemetry import metrics
+
+DONE = object()
+
+
+def run_parse(parse, content, context):
+    # Runs in a worker process: collect that process's metrics for this job
+    # and ship them back with the rows so the parent can merge them. The
+    # registry (and its lock) were already replaced at fork, see telemetry.py
+    metrics.reset()
+    with metrics.timer('stage', stage='parse'):
+        rows = parse(content, context)
+    return rows, metrics.snapshot()
+
+
+def run_pipeline(jobs, fetcher, parse, write, fetch_workers=4, parse_workers=2, queue_size=8):
+    # jobs: iterable of (url, context)
+    # parse(content, context) -> rows runs in a process pool, so it must be a
+    # top-level function; write(context, rows) runs on this thread only.
+    job_queue = queue.Queue()
+    for job in jobs:
+        job_queue.put(job)
+    # Bounded so fetchers block instead of piling raw pages up in memory
+    pages = queue.Queue(maxsize=queue_size)
+
+    def fetch_worker():
+        while True:
+            try:
+                url, context = job_queue.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                with metrics.timer('stage', stage='fetch'):
+                    response = fetcher.get(url)
+            except Exception as e:
+                print(f"Error fetching {url}: {str(e)}")
+                continue
+            if response is None:
+                continue
+            if response.status_code != 200:
+                print(f"Skipping {url}: HTTP {response.status_code}")
+                continue
+            pages.put((context, response.content))
+
+    threads = [threading.Thread(target=fetch_worker, daemon=True) for _ in range(fetch_workers)]
+    for thread in threads:
+        thread.start()
+
+    def close_when_fetched():
+        for thread in threads:
+            thread.join()
+        pages.put(DONE)
+
+    threading.Thread(target=close_when_fetched, daemon=True).start()
+
+    written = 0
+    with concurrent.futures.ProcessPoolExecutor(max_workers=parse_workers) as executor:
+        in_flight = {}
+
+        def drain(return_when):
+            nonlocal written
+            done, _ = concurrent.futures.wait(in_flight, return_when=return_when)
+            for future in done:
+                context = in_flight.pop(future)
+                try:
+                    rows, snapshot = future.result()
+                except Exception as e:
+                    print(f"Error parsing {context}: {str(e)}")
+                    metrics.inc('parse_errors')
+                    continue
+                metrics.merge(snapshot)
+                with metrics.timer('stage', stage='write'):
+                    write(context, rows)
+                written += len(rows)
+
+        while True:
+            item = pages.get()
+            if item is DONE:
+                break
+            context, content = item
+            in_flight[executor.submit(run_parse, parse, content, context)] = context
+            # Stop pulling pages while every parser already has work queued
+            if len(in_flight) >= parse_workers * 2:
+                drain(concurrent.futures.FIRST_COMPLETED)
+        if in_flight:
+            drain(concurrent.futures.ALL_COMPLETED)
+    return written
@@ -0,0 +1,190 @@
+# fbref competition ids; they appear as the suffix of every squad stat table id
+COMPETITIONS = {
+    'Premier-League': 9,
+    'La-Liga': 12,
+    'Serie-A': 11,
+    'Bundesliga': 20,
+    'Ligue-1': 13,
+}
+
+table_kinds = ['standard', 'keeper', 'shooting', 'passing', 'gca', 'defense', 'possession', 'misc']
+
+
+def table_ids_for(comp_id):
+    return [f'div_stats_{kind}_{comp_id}' for kind in table_kinds]
+
+
+def results_div_id(season, comp_id):
+    # League table on a competition page, e.g. all_results2024-202591
+    return f'all_results{season}{comp_id}1'
+
+
+table_ids = table_ids_for(COMPETITIONS['Premier-League'])
+
+data_stats = [
+    [
+        'nationality',
+        'position',
+        'age', 
+        'games',
+        'games_starts',
+        'minutes',
+        'goals',
+        'assists',
+        'cards_yellow',
+        'cards_red',
+        'xg',
+        'xg_assist',
+        'progressive_carries',
+        'progressive_passes',
+        'progressive_passes_received',
+        'goals_per90',
+        'assists_per90',
+        'xg_per90',
+        'xg_assist_per90'
+    ],
+    [
+        'gk_goals_against_per90',
+        'gk_save_pct',
+        'gk_clean_sheets_pct',
+        'gk_pens_save_pct'
+    ], 
+    [
+        'shots_on_target_pct',
+        'shots_on_target_per90',
+        'goals_per_shot',
+        'average_shot_distance'
+    ],
+    [
+        'passes_completed',
+        'passes_pct',
+        'passes_total_distance',
+        'passes_pct_short',
+        'passes_pct_medium',
+        'passes_pct_long',
+        'assisted_shots',
+        'passes_into_final_third',
+        'passes_into_penalty_area',
+        'crosses_into_penalty_area',
+        'progressive_passes'
+    ],
+    [
+        'sca',
+        'sca_per90',
+        'gca',
+        'gca_per90'
+    ],
+    [
+        'tackles',
+        'tackles_won',
+        'challenges',
+        'challenges_lost',
+        'blocks',
+        'blocked_shots',
+        'blocked_passes',
+        'interceptions'
+    ],
+    [
+        'touches',
+        'touches_def_pen_area',
+        'touches_def_3rd',
+        'touches_mid_3rd',
+        'touches_att_3rd',
+        'touches_att_pen_area',
+        'take_ons',
+        'take_ons_won_pct',
+        'take_ons_tackled_pct',
+        'carries',
+        'carries_progressive_distance',
+        'progressive_carries',
+        'carries_into_final_third',
+        'carries_into_penalty_area',
+        'miscontrols',
+        'dispossessed',
+        'passes_received',
+        'progressive_passes_received'
+    ],
+    [
+        'fouls',
+        'fouled',
+        'offsides',
+        'crosses',
+        'ball_recoveries',
+        'aerials_won',
+        'aerials_lost',
+        'aerials_won_pct'
+    ]
+]
+
+
+columns = ['Player', 'Nation', 'Team', 'Position', 'Age', 'Matches played', 'Starts', 'Minutes','Goals',
+            'Assists', 'Yellow Cards', 'Red Cards', 'Expected Goals',
+            'Expedted Assist Goals', 'Progressive Carries in Progression', 'Progressive Passes in Progression',
+            'Progressive Passes Received in Progression', 'Goals Scored per 90 minutes','Assists per 90 minutes',
+            'Expected Goals per 90 minutes', 'Expected Assists Goals per 90 minutes',
+            'Goals Against per 90 minutes', 'Save Percentage', 'Clean Sheets Percentage',
+            'Penalty Save Percentage', 'Percentage of shots that are on target', 'Shots on target per 90 minutes',
+            'Goals per shot', 'Average Shot Distance', 'Passes Completed', 'Pass Completion Percentage',
+            'Total Passing Distance','Passes Completion Percentage (Short)','Passes Completion Percentage (Medium)',
+            'Passes Completion Percentage (Long)', 'Key Passes', 'Passes into Final Third', 'Passes into Penalty Area',
+            'Crosses into Penalty Area', 'Progressive Passes in Expected','Shot-Creating Actions','Shot-Creating Actions per 90 minutes',
+            'Goal-Creating Actions','Goal-Creating Actions per 90 minutes','Tackles','Tackles Won','Dribblers Tackled',
+            'Dribbles Challenged', 'Blocks', 'Shots Blocked','Passes Blocked', 'Interceptions','Touches','Touches(Defensive Penalty Area)','Touches(Defensive Third)',
+            'Touches(Mid Third)', 'Touches(Attacking Third)','Touches(Attacking Penalty Area)','Take-Ons Attempted(Take-Ons)','Percentage of Take-Ons Completed Successfully',
+            'Tackled During Take-Ons Percentage','Carries','Progressive Carrying Distance','Progressive Carries in Carries', 'Carries into Final Third','Carries into Penalty Area',
+            'Miscontrols', 'Dispossessed','Passes Received', 'Progressive Passes Received in Receiving', 'Fouls Committed',
+            'Fouls Drawn', 'Offsides', 'Crosses','Ball Recoveries','Aerials Won','Aerials Lost','Aerials Won Percentage']
+
+# data-stat names whose values are whole numbers; every other stat is a float
+integer_stats = {
+    'games', 'games_starts', 'minutes', 'goals', 'assists', 'cards_yellow', 'cards_red',
+    'progressive_carries', 'progressive_passes', 'progressive_passes_received',
+    'passes_completed', 'passes_total_distance', 'assisted_shots', 'passes_into_final_third',
+    'passes_into_penalty_area', 'crosses_into_penalty_area', 'sca', 'gca',
+    'tackles', 'tackles_won', 'challenges', 'challenges_lost', 'blocks', 'blocked_shots',
+    'blocked_passes', 'interceptions', 'touches', 'touches_def_pen_area', 'touches_def_3rd',
+    'touches_mid_3rd', 'touches_att_3rd', 'touches_att_pen_area', 'take_ons', 'carries',
+    'carries_progressive_distance', 'carries_into_final_third', 'carries_into_penalty_area',
+    'miscontrols', 'dispossessed', 'passes_received', 'fouls', 'fouled', 'offsides',
+    'crosses', 'ball_recoveries', 'aerials_won', 'aerials_lost'
+}
+# Age stays as fbref's "years-days" text
+text_stats = {'player', 'nationality', 'team', 'position', 'age'}
+# data-stats where the smaller value is the better one, e.g. when ranking teams
+lower_is_better = {
+    'gk_goals_against_per90', 'cards_red', 'cards_yellow', 'offsides', 'miscontrols',
+    'dispossessed', 'fouls', 'take_ons_tackled_pct', 'aerials_lost'
+}
+
+
+def column_stats():
+    # data-stat behind each entry of `columns`, in the order rows are built
+    stats = ['player']
+    for dstats in data_stats:
+        for dstat in dstats:
+            stats.append(dstat)
+            if dstat == 'nationality':
+                stats.append('team')
+    return dict(zip(columns, stats))
+
+
+def column_dtypes():
+    dtypes = {}
+    for column, dstat in column_stats().items():
+        if dstat in text_stats:
+            dtypes[column] = 'string'
+        elif dstat in integer_stats:
+            dtypes[column] = 'Int64'
+        else:
+            dtypes[column] = 'float64'
+    return dtypes
+
+
+def column_directions():
+    # +1 where a higher value is better, -1 where lower is, for every stat column
+    # (Age included, it is numeric once cleaned)
+    return {
+        column: -1 if dstat in lower_is_better else 1
+        for column, dstat in column_stats().items()
+        if dstat not in ('player', 'nationality', 'team', 'position')
+    }
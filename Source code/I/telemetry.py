@@ -0,0 +1,129 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+PREFIX = 'scraper'
+
+
+class Metrics:
+    # Counters and duration summaries keyed by (name, sorted labels)
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.started = time.time()
+            self.counters = {}
+            self.summaries = {}
+
+    def after_fork(self):
+        # A forked child inherits the lock in whatever state a parent thread
+        # left it (e.g. held by a fetch thread mid-inc), so it gets a fresh
+        # lock and an empty registry without touching the inherited lock
+        self.lock = threading.Lock()
+        self.started = time.time()
+        self.counters = {}
+        self.summaries = {}
+
+    def inc(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            count, total, peak = self.summaries.get(key, (0, 0.0, 0.0))
+            self.summaries[key] = (count + 1, total + value, max(peak, value))
+
+    @contextmanager
+    def timer(self, name, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                'counters': [[name, dict(labels), value] for (name, labels), value in self.counters.items()],
+                'summaries': [[name, dict(labels), list(stats)] for (name, labels), stats in self.summaries.items()],
+            }
+
+    def merge(self, snapshot):
+        # Fold in a snapshot taken in another process (e.g. a parser worker)
+        with self.lock:
+            for name, labels, value in snapshot['counters']:
+                key = (name, tuple(sorted(labels.items())))
+                self.counters[key] = self.counters.get(key, 0) + value
+            for name, labels, (count, total, peak) in snapshot['summaries']:
+                key = (name, tuple(sorted(labels.items())))
+                old_count, old_total, old_peak = self.summaries.get(key, (0, 0.0, 0.0))
+                self.summaries[key] = (old_count + count, old_total + total, max(old_peak, peak))
+
+    def summary(self, **extra):
+        snapshot = self.snapshot()
+        totals = {}
+        for name, _, value in snapshot['counters']:
+            totals[name] = totals.get(name, 0) + value
+        timings = {}
+        for name, labels, (count, total, peak) in snapshot['summaries']:
+            label = ','.join(f'{k}={v}' for k, v in sorted(labels.items()))
+            timings[f'{name}{{{label}}}' if label else name] = {
+                'count': count, 'sum': round(total, 6), 'max': round(peak, 6),
+                'mean': round(total / count, 6) if count else 0.0,
+            }
+        return dict(extra, started=self.started, wall_seconds=round(time.time() - self.started, 3),
+                    totals=totals, timings=timings, **snapshot)
+
+    def export_json(self, path, **extra):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.summary(**extra), f, indent=2, ensure_ascii=False, default=str)
+
+    def export_prometheus(self, path):
+        # Textfile collector format; written via rename so scrapes never see half a file
+        lines = []
+        snapshot = self.snapshot()
+        seen = set()
+        for name, labels, value in sorted(snapshot['counters'], key=lambda c: c[0]):
+            metric = f'{PREFIX}_{name}_total'
+            if metric not in seen:
+                lines.append(f'# TYPE {metric} counter')
+                seen.add(metric)
+            lines.append(f'{metric}{format_labels(labels)} {value}')
+        for name, labels, (count, total, _) in sorted(snapshot['summaries'], key=lambda s: s[0]):
+            metric = f'{PREFIX}_{name}_seconds'
+            if metric not in seen:
+                lines.append(f'# TYPE {metric} summary')
+                seen.add(metric)
+            lines.append(f'{metric}_count{format_labels(labels)} {count}')
+            lines.append(f'{metric}_sum{format_labels(labels)} {total:.6f}')
+        with open(path + '.tmp', 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n')
+        os.replace(path + '.tmp', path)
+
+
+def format_labels(labels):
+    if not labels:
+        return ''
+    escaped = []
+    for key, value in sorted(labels.items()):
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        escaped.append(f'{key}="{value}"')
+    return '{' + ','.join(escaped) + '}'
+
+
+def export(folder, prefix='run', **extra):
+    os.makedirs(folder, exist_ok=True)
+    metrics.export_json(os.path.join(folder, f'{prefix}_summary.json'), **extra)
+    metrics.export_prometheus(os.path.join(folder, f'{prefix}_metrics.prom'))
+
+
+# Process-wide registry
+metrics = Metrics()
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=metrics.after_fork)
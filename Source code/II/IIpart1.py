@@ -1,60 +1,71 @@
 import pandas as pd
-import numpy as np
-import os 
+import os
+import argparse
+from cleaning import load_cleaned, days_to_age
+from topk import top_bottom_k, grouped_top_bottom_k
+from chunked import TopK, run_chunked
 
-def age_to_days(age_str):
-    try:
-        years, days = map(int, age_str.split('-'))
-        return years * 365 + days
-    except:
-        return np.nan
 
-def days_to_age(days_total):
-    years = days_total // 365
-    days = days_total % 365
-    return f"{int(years)}-{int(days)}"
-
-
-os.makedirs("II", exist_ok=True)
-
-df = pd.read_csv('I/results.csv')  
-df_cleaned = df.copy()
-
-stats = [col for col in df_cleaned.columns if col not in ['Player', 'Nation', 'Team', 'Position']]
-
-df_cleaned['Age'] = df_cleaned['Age'].apply(age_to_days)
-df_cleaned["Minutes"] = df_cleaned["Minutes"].str.replace(",", "")
-df_cleaned.replace('N/a', pd.NA, inplace=True)
-
-
-for stat in stats:
-    df_cleaned[stat] = pd.to_numeric(df_cleaned[stat], errors='coerce')
-
-with open('II/top3.txt', 'w', encoding='utf-8', errors='ignore') as f:  
-    for stat in stats:
+def write_leaders(f, df_cleaned, leaders, k):
+    for stat, (top_pos, bot_pos) in leaders.items():
         f.write(f"--- {stat} ---\n")
-        valid = df_cleaned.dropna(subset=[stat])
-        
-        top3 = valid.nlargest(3, stat)
-        bot3 = valid.nsmallest(3, stat)
+        top3 = df_cleaned.iloc[top_pos].copy()
+        bot3 = df_cleaned.iloc[bot_pos].copy()
 
-        
         if stat == 'Age':
             for df_ in (top3, bot3):
-                df_['Age'] = df_['Age'].apply(days_to_age)
-        
+                df_['Age'] = days_to_age(df_['Age'])
+
         display_cols = ['Player','Nation','Team','Position', stat]
 
-        f.write("Top 3:\n")
+        f.write(f"Top {k}:\n")
         f.write(top3[display_cols].to_string(
-            index=False,          
-            justify='left',     
+            index=False,
+            justify='left',
             col_space=15
         ))
-        f.write("\n\nBottom 3:\n")
+        f.write(f"\n\nBottom {k}:\n")
         f.write(bot3[display_cols].to_string(
-            index=False,          
-            justify='left',    
+            index=False,
+            justify='left',
             col_space=15
         ))
         f.write("\n\n")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-k', type=int, default=3, help='players listed at each end of every stat')
+    parser.add_argument('--group-by', choices=['Team', 'Position', 'Nation'], help='rank within each group')
+    parser.add_argument('--input', nargs='+', default=['I/results.csv'])
+    parser.add_argument('--chunksize', type=int, help='stream the input in chunks of this many rows')
+    parser.add_argument('--output', default='II/top3.txt')
+    args = parser.parse_args()
+
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+
+    if args.chunksize:
+        # Only leader candidates are kept between chunks
+        (top,), _ = run_chunked(args.input, args.chunksize,
+                                lambda stats: [TopK(stats, args.k, args.group_by)], age='days')
+        df_cleaned, found = top.result()
+        stats = top.stats
+    else:
+        df_cleaned = pd.concat([load_cleaned(path, age='days') for path in args.input], ignore_index=True)
+        stats = [col for col in df_cleaned.columns if col not in ['Player', 'Nation', 'Team', 'Position']]
+        if args.group_by is None:
+            found = top_bottom_k(df_cleaned, stats, args.k)
+        else:
+            found = grouped_top_bottom_k(df_cleaned, stats, args.group_by, args.k)
+
+    with open(args.output, 'w', encoding='utf-8', errors='ignore') as f:
+        if args.group_by is None:
+            write_leaders(f, df_cleaned, found, args.k)
+        else:
+            for group, leaders in found.items():
+                f.write(f"=== {args.group_by}: {group} ===\n\n")
+                write_leaders(f, df_cleaned, leaders, args.k)
+
+
+if __name__ == "__main__":
+    main()
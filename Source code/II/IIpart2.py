@@ -1,36 +1,75 @@
 import pandas as pd
 import os
-def Age_to_year(age_str):
-    years, days = map(float, age_str.split('-'))
-    days = float(days / 365)
-    years = years + days
-    return years
-df = pd.read_csv('I/results.csv')
-df_cleaned = df.copy()
-stats = [col for col in df_cleaned.columns 
-        if col not in ['Player', 'Nation', 'Team', 'Position']]
-df_cleaned['Age'] = df_cleaned['Age'].apply(Age_to_year)
-df_cleaned["Minutes"] = df_cleaned["Minutes"].str.replace(",", "")
-df_cleaned.replace('N/a', pd.NA, inplace=True)
-for stat in stats:
-    df_cleaned[stat] = pd.to_numeric(df_cleaned[stat], errors='coerce')
-results = []
-all_stats = {'Team': 'All'}
-for attr in stats:
-    all_stats[f'Median of {attr}'] = df_cleaned[attr].median()
-    all_stats[f'Mean of {attr}'] = df_cleaned[attr].mean()
-    all_stats[f'Std of {attr}'] = df_cleaned[attr].std()
-results.append(all_stats)
-for team, team_df in df_cleaned.groupby('Team'):
-    team_stats = {'Team': team}
-    for attr in stats:
-        team_stats[f'Median of {attr}'] = team_df[attr].median()
-        team_stats[f'Mean of {attr}'] = team_df[attr].mean()
-        team_stats[f'Std of {attr}'] = team_df[attr].std()
-    results.append(team_stats)
-results_df = pd.DataFrame(results)
-columns_order = ['Team']
-for attr in stats:
-    columns_order.extend([f'Median of {attr}', f'Mean of {attr}', f'Std of {attr}'])
-results_df = results_df[columns_order]
-results_df.to_csv('II/results2.csv', na_rep='N/a', index=True)
+import argparse
+from cleaning import load_cleaned
+from sketch import sketch_aggregate, partition_paths, DEFAULT_DELTA
+from chunked import Aggregates, run_chunked
+
+
+def quantile_label(q):
+    return f"Q{q * 100:g}"
+
+
+def aggregate(df_cleaned, stats, group_by='Team', quantiles=()):
+    # One groupby pass for median/mean/std of every stat, with an 'All' row
+    # on top, laid out as <Measure> of <stat> column triples
+    grouped = df_cleaned.groupby(group_by)[stats]
+    groups = grouped.agg(['median', 'mean', 'std'])
+    overall = df_cleaned[stats].agg(['median', 'mean', 'std']).unstack().to_frame().T
+    overall.index = ['All']
+
+    measures = {'median': 'Median', 'mean': 'Mean', 'std': 'Std'}
+    frames = [pd.concat([overall, groups])]
+    for q in quantiles:
+        label = quantile_label(q)
+        measures[label] = label
+        by_group = grouped.quantile(q)
+        by_group.loc['All'] = df_cleaned[stats].quantile(q)
+        by_group.columns = pd.MultiIndex.from_product([by_group.columns, [label]])
+        frames.append(by_group)
+
+    table = pd.concat(frames, axis=1)
+    columns_order = [(attr, measure) for attr in stats for measure in measures]
+    results_df = table[columns_order]
+    results_df.columns = [f'{measures[measure]} of {attr}' for attr, measure in columns_order]
+    results_df = results_df.rename_axis(group_by).reset_index()
+    return results_df
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--group-by', choices=['Team', 'Position', 'Nation'], default='Team')
+    parser.add_argument('--quantiles', type=float, nargs='*', default=[], help='e.g. 0.25 0.75')
+    parser.add_argument('--partitions', metavar='ROOT',
+                        help='summarise crawl partitions under ROOT with mergeable sketches instead of I/results.csv')
+    parser.add_argument('--delta', type=float, default=DEFAULT_DELTA, help='t-digest compression for --partitions/--chunksize')
+    parser.add_argument('--input', nargs='+', default=['I/results.csv'])
+    parser.add_argument('--chunksize', type=int, help='stream the input in chunks of this many rows')
+    parser.add_argument('--output', default='II/results2.csv')
+    args = parser.parse_args()
+
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+    if args.partitions:
+        # Medians/quantiles are approximate here, see sketch.py for the bound
+        results_df = sketch_aggregate(partition_paths(args.partitions), args.group_by,
+                                      args.quantiles, args.delta)
+        results_df.to_csv(args.output, na_rep='N/a', index=True)
+        return
+
+    if args.chunksize:
+        # Exact mean/std, medians and quantiles from t-digests (see sketch.py)
+        (aggregates,), _ = run_chunked(args.input, args.chunksize,
+                                       lambda stats: [Aggregates(stats, args.group_by, args.delta)])
+        results_df = aggregates.result(args.quantiles)
+        results_df.to_csv(args.output, na_rep='N/a', index=True)
+        return
+
+    df_cleaned = pd.concat([load_cleaned(path, age='years') for path in args.input], ignore_index=True)
+    stats = [col for col in df_cleaned.columns
+            if col not in ['Player', 'Nation', 'Team', 'Position']]
+    results_df = aggregate(df_cleaned, stats, args.group_by, args.quantiles)
+    results_df.to_csv(args.output, na_rep='N/a', index=True)
+
+
+if __name__ == "__main__":
+    main()
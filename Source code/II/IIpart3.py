@@ -1,103 +1,208 @@
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
+import matplotlib
+matplotlib.use('Agg')
+from matplotlib.figure import Figure
 import os  # Thêm thư viện xử lý thư mục
+import json
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from cleaning import load_cleaned
 
 output_dir = "II/Histogram img"
-os.makedirs(output_dir, exist_ok=True)
-
-# Phần code xử lý data giữ nguyên
-df = pd.read_csv('I/results.csv')
-df_cleaned = df.copy()
-df_cleaned.replace('N/a', pd.NA, inplace=True)
+MANIFEST = 'render_manifest.json'
+# Bump when the look of the charts changes so every PNG is redrawn once
+RENDER_VERSION = 1
 
 attack = ['Goals', 'Assists', 'Expected Goals']
 defense = ['Tackles', 'Interceptions', 'Blocks']
 
-for stat in attack + defense:
-    df_cleaned[stat].fillna(0, inplace=True)
-    df_cleaned[stat] = pd.to_numeric(df_cleaned[stat], errors='coerce')
-plt.figure(figsize=(15, 5))
-for i, stat in enumerate(attack, 1):
-    plt.subplot(1, 3, i)
-    plt.hist(df_cleaned[stat], bins=15, color='blue', edgecolor='black')
-    plt.title(f'Distribution {stat}')
-    plt.xlabel(stat)
-    plt.ylabel('Frequency')
-plt.tight_layout()
-plt.savefig(f"{output_dir}/All player_attack.png")
-plt.figure(figsize=(15, 5))
-for i, stat in enumerate(defense, 1):
-    plt.subplot(1, 3, i)
-    plt.hist(df_cleaned[stat], bins=15, color='red', edgecolor='black')
-    plt.title(f'Distribution {stat}')
-    plt.xlabel(stat)
-    plt.ylabel('Frequency')
-plt.tight_layout()
-plt.savefig(f"{output_dir}/All player_defense.png")
-df_teams = df_cleaned.dropna(subset=['Team'])
-teams = df_teams['Team'].unique()
-
-for team in teams:
-    team_data = df_teams[df_teams['Team'] == team]
-    team_data[attack + defense] = team_data[attack + defense].fillna(0)
-    plt.figure(figsize=(15, 6))
-    plt.suptitle(f'TEAM PERFORMANCE ANALYSIS: {team.upper()}', 
-                fontsize=16, 
-                fontweight='bold', 
-                y=1.05,
-                color='navy')
-    
-    for i, stat in enumerate(attack, 1):
-        plt.subplot(1, 3, i)
-        n, bins, patches = plt.hist(team_data[stat], 
-                                  bins=12, 
-                                  color='royalblue', 
-                                  edgecolor='white',
-                                  alpha=0.8)
-        plt.gca().text(0.95, 0.95, 
-                      f'Total players: {len(team_data)}\n'
-                      f'Medium: {team_data[stat].mean():.1f}\n'
-                      f'Max: {team_data[stat].max()}',
-                      transform=plt.gca().transAxes,
-                      verticalalignment='top',
-                      horizontalalignment='right',
-                      bbox=dict(facecolor='white', alpha=0.8))
-        
-        plt.title(f'{stat}\n', fontsize=12, fontweight='bold')
-        plt.xlabel('Value', fontsize=9)
-        plt.ylabel('Number of players', fontsize=9)
-        plt.grid(axis='y', alpha=0.3)
-    
-    plt.tight_layout()
-    plt.savefig(f"{output_dir}/{team}_attack.png")  
-    plt.close()  
-    
-    plt.figure(figsize=(15, 6))
-    plt.suptitle(f'TEAM PERFORMANCE ANALYSIS: {team.upper()}', 
-                fontsize=16, 
-                fontweight='bold', 
-                y=1.05,
-                color='darkred')
-    
-    for i, stat in enumerate(defense, 1):
-        plt.subplot(1, 3, i)
-        n, bins, patches = plt.hist(team_data[stat], 
-                                  bins=12, 
-                                  color='firebrick', 
-                                  edgecolor='white',
-                                  alpha=0.8)
-        plt.axvline(team_data[stat].mean(), 
-                   color='gold', 
-                   linestyle='dashed', 
-                   linewidth=2,
-                   label=f'Medium: {team_data[stat].mean():.1f}')
-        plt.title(f'{stat}\n', fontsize=12, fontweight='bold')
-        plt.xlabel('Value', fontsize=9)
-        plt.ylabel('Number of players', fontsize=9)
-        plt.legend()
-        plt.grid(axis='y', alpha=0.3)  
-    
-    plt.tight_layout()
-    plt.savefig(f"{output_dir}/{team}_defense.png")  
-    plt.close() 
\ No newline at end of file
+
+def grouped_histograms(values, codes, n_groups, bins):
+    # Per-group histograms of every column in one pass: bins span each group's
+    # own min..max like np.histogram, and one bincount fills all of them.
+    # Returns counts (groups x stats x bins) and edges (groups x stats x bins+1).
+    n_stats = values.shape[1]
+    lo = np.full((n_groups, n_stats), np.inf)
+    hi = np.full((n_groups, n_stats), -np.inf)
+    np.minimum.at(lo, codes, values)
+    np.maximum.at(hi, codes, values)
+    flat = lo == hi
+    lo, hi = np.where(flat, lo - 0.5, lo), np.where(flat, hi + 0.5, hi)
+
+    # Same edges as np.histogram, and values are binned against them (the
+    # searchsorted(side='right') rule) so values on an edge land in the same
+    # bin np.histogram puts them in
+    edges = np.linspace(lo, hi, bins + 1, axis=-1)
+    rows, cols = codes[:, None], np.arange(n_stats)
+    idx = np.floor((values - lo[codes]) / (hi - lo)[codes] * bins).astype(np.intp)
+    idx = np.clip(idx, 0, bins - 1)
+    idx -= values < edges[rows, cols, idx]
+    idx += (values >= edges[rows, cols, idx + 1]) & (idx < bins - 1)
+    slot = (codes[:, None] * n_stats + np.arange(n_stats)) * bins + idx
+    counts = np.bincount(slot.ravel(), minlength=n_groups * n_stats * bins)
+    counts = counts.reshape(n_groups, n_stats, bins)
+    return counts, edges
+
+
+def data_hash(frame):
+    rows = pd.util.hash_pandas_object(frame, index=False).to_numpy()
+    return hashlib.sha1(rows.tobytes() + str(RENDER_VERSION).encode()).hexdigest()
+
+
+def draw_bars(ax, counts, edges, **style):
+    # Same patches plt.hist would draw for precomputed bins
+    ax.bar(edges[:-1], counts, width=np.diff(edges), align='edge', **style)
+
+
+def render_all_players(spec, path):
+    fig = Figure(figsize=(15, 5))
+    for i, panel in enumerate(spec['panels'], 1):
+        ax = fig.add_subplot(1, 3, i)
+        draw_bars(ax, panel['counts'], panel['edges'], color=spec['color'], edgecolor='black')
+        ax.set_title(f"Distribution {panel['stat']}")
+        ax.set_xlabel(panel['stat'])
+        ax.set_ylabel('Frequency')
+    fig.tight_layout()
+    fig.savefig(path)
+
+
+def render_team(spec, path):
+    fig = Figure(figsize=(15, 6))
+    fig.suptitle(f"TEAM PERFORMANCE ANALYSIS: {spec['team'].upper()}",
+                 fontsize=16,
+                 fontweight='bold',
+                 y=1.05,
+                 color=spec['title_color'])
+
+    for i, panel in enumerate(spec['panels'], 1):
+        ax = fig.add_subplot(1, 3, i)
+        draw_bars(ax, panel['counts'], panel['edges'],
+                  color=spec['color'], edgecolor='white', alpha=0.8)
+        if spec['kind'] == 'attack':
+            ax.text(0.95, 0.95,
+                    f"Total players: {spec['players']}\n"
+                    f"Medium: {panel['mean']:.1f}\n"
+                    f"Max: {panel['max']}",
+                    transform=ax.transAxes,
+                    verticalalignment='top',
+                    horizontalalignment='right',
+                    bbox=dict(facecolor='white', alpha=0.8))
+        else:
+            ax.axvline(panel['mean'],
+                       color='gold',
+                       linestyle='dashed',
+                       linewidth=2,
+                       label=f"Medium: {panel['mean']:.1f}")
+            ax.legend()
+        ax.set_title(f"{panel['stat']}\n", fontsize=12, fontweight='bold')
+        ax.set_xlabel('Value', fontsize=9)
+        ax.set_ylabel('Number of players', fontsize=9)
+        ax.grid(axis='y', alpha=0.3)
+
+    fig.tight_layout()
+    fig.savefig(path)
+
+
+def render(job):
+    spec, path = job
+    if spec['kind'] == 'all':
+        render_all_players(spec, path)
+    else:
+        render_team(spec, path)
+    return path
+
+
+def build_jobs(df_cleaned):
+    # (name, data hash, spec) for every PNG the report contains
+    stats = attack + defense
+    df_cleaned = df_cleaned.copy()
+    df_cleaned[stats] = df_cleaned[stats].fillna(0)
+    jobs = []
+
+    # All players: one group, 15 bins
+    values = df_cleaned[stats].to_numpy(dtype='float64')
+    counts, edges = grouped_histograms(values, np.zeros(len(values), dtype=np.intp), 1, 15)
+    digest = data_hash(df_cleaned[stats])
+    for kind, color, cols in (('attack', 'blue', attack), ('defense', 'red', defense)):
+        panels = [{'stat': stat, 'counts': counts[0, stats.index(stat)], 'edges': edges[0, stats.index(stat)]}
+                  for stat in cols]
+        jobs.append((f"All player_{kind}", digest, {'kind': 'all', 'color': color, 'panels': panels}))
+
+    # Teams: 12 bins each, all teams binned together
+    df_teams = df_cleaned.dropna(subset=['Team'])
+    teams = df_teams['Team'].unique()
+    codes = pd.Categorical(df_teams['Team'], categories=teams).codes.astype(np.intp)
+    values = df_teams[stats].to_numpy(dtype='float64')
+    counts, edges = grouped_histograms(values, codes, len(teams), 12)
+    grouped = df_teams.groupby('Team', sort=False)[stats]
+    means, maxes, sizes = grouped.mean(), grouped.max(), df_teams.groupby('Team', sort=False).size()
+
+    for g, team in enumerate(teams):
+        digest = data_hash(df_teams.loc[codes == g, stats])
+        for kind, color, title_color, cols in (('attack', 'royalblue', 'navy', attack),
+                                               ('defense', 'firebrick', 'darkred', defense)):
+            panels = [{'stat': stat,
+                       'counts': counts[g, stats.index(stat)],
+                       'edges': edges[g, stats.index(stat)],
+                       'mean': means.at[team, stat],
+                       'max': maxes.at[team, stat]}
+                      for stat in cols]
+            spec = {'kind': kind, 'team': team, 'players': int(sizes[team]),
+                    'color': color, 'title_color': title_color, 'panels': panels}
+            jobs.append((f"{team}_{kind}", digest, spec))
+    return jobs
+
+
+def load_manifest(out_dir):
+    path = os.path.join(out_dir, MANIFEST)
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_manifest(out_dir, manifest):
+    path = os.path.join(out_dir, MANIFEST)
+    tmp = path + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def render_report(df_cleaned, out_dir=output_dir, workers=None, force=False):
+    # Redraw only the PNGs whose input data changed since the last run
+    os.makedirs(out_dir, exist_ok=True)
+    manifest = {} if force else load_manifest(out_dir)
+    pending, skipped = [], 0
+    for name, digest, spec in build_jobs(df_cleaned):
+        path = os.path.join(out_dir, f"{name}.png")
+        if manifest.get(name) == digest and os.path.exists(path):
+            skipped += 1
+            continue
+        pending.append((name, digest, (spec, path)))
+
+    if pending:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for (name, digest, _), _ in zip(pending, pool.map(render, [job for _, _, job in pending])):
+                manifest[name] = digest
+        save_manifest(out_dir, manifest)
+    print(f"Rendered {len(pending)} charts, {skipped} unchanged")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--input', default='I/results.csv')
+    parser.add_argument('--output-dir', default=output_dir)
+    parser.add_argument('--workers', type=int)
+    parser.add_argument('--force', action='store_true', help='redraw every chart')
+    args = parser.parse_args()
+
+    # Phần code xử lý data giữ nguyên
+    df_cleaned = load_cleaned(args.input)
+    render_report(df_cleaned, args.output_dir, args.workers, args.force)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from cleaning import clean_players
+from ranking import stat_leaders
+from sketch import DEFAULT_DELTA, build_digests, merge_digests, sketch_table
+from streaming import RunningStats
+from topk import top_bottom_k, grouped_top_bottom_k
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'I'))
+from loader import NA_VALUES, typed_paths, is_fresh
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:
+    pq = None
+
+# Out-of-core versions of the IIpart1/2/4 reports: the player table is read
+# chunk by chunk and each report keeps only a small running state, so memory
+# is bounded by the chunk size rather than by the number of players.
+
+
+def read_chunks(path, chunksize):
+    # Raw chunks from the Parquet file next to the CSV when it is fresh,
+    # otherwise from the CSV itself
+    parquet_path, _ = typed_paths(path)
+    if pq is not None and is_fresh(parquet_path, path):
+        for batch in pq.ParquetFile(parquet_path).iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, dtype=str, na_values=NA_VALUES, keep_default_na=False,
+                               chunksize=chunksize)
+
+
+def iter_chunks(paths, chunksize, age='years'):
+    # Cleaned chunks across every input, indexed by global row number
+    offset = 0
+    for path in paths:
+        for chunk in read_chunks(path, chunksize):
+            chunk = clean_players(chunk, age)
+            chunk.index = pd.RangeIndex(offset, offset + len(chunk))
+            offset += len(chunk)
+            yield chunk
+
+
+def stat_columns(df):
+    return [col for col in df.columns if col not in ['Player', 'Nation', 'Team', 'Position']]
+
+
+class TopK:
+    # Top/bottom k per stat (optionally per group). Only rows that are a
+    # candidate for some stat are carried from chunk to chunk; they stay in
+    # global row order, so ties break exactly like the in-memory report.
+    def __init__(self, stats, k=3, group_by=None):
+        self.stats = stats
+        self.k = k
+        self.group_by = group_by
+        self.candidates = None
+
+    def leaders(self, frame):
+        if self.group_by is None:
+            return top_bottom_k(frame, self.stats, self.k)
+        return grouped_top_bottom_k(frame, self.stats, self.group_by, self.k)
+
+    def update(self, chunk):
+        frame = chunk if self.candidates is None else pd.concat([self.candidates, chunk])
+        found = self.leaders(frame)
+        per_stat = found.values() if self.group_by is None else \
+            (pair for group in found.values() for pair in group.values())
+        rows = [np.concatenate(pair) for pair in per_stat]
+        keep = np.unique(np.concatenate(rows)) if rows else np.empty(0, dtype=np.intp)
+        self.candidates = frame.iloc[keep]
+        return self
+
+    def result(self):
+        # (candidate rows, leaders as iloc positions into them)
+        return self.candidates, self.leaders(self.candidates)
+
+
+class Leaders:
+    # Best player value of every stat and the groups holding it
+    def __init__(self, stats, group_by='Team'):
+        self.stats = stats
+        self.group_by = group_by
+        self.best = {}
+
+    def update(self, chunk):
+        for stat, (value, groups) in stat_leaders(chunk, self.stats, self.group_by).items():
+            current = self.best.get(stat)
+            if current is None or np.isnan(current[0]) or value > current[0]:
+                self.best[stat] = (value, groups)
+            elif value == current[0]:
+                current[1].extend(g for g in groups if g not in current[1])
+        return self
+
+    def result(self):
+        return {stat: self.best[stat] for stat in self.stats}
+
+
+class Aggregates:
+    # IIpart2 table: exact mean/std from RunningStats, medians and quantiles
+    # from merged t-digests. Those are exact while a (group, stat) digest holds
+    # at most sketch.EXACT_LIMIT values (see sketch.py for the bound past it)
+    def __init__(self, stats, group_by='Team', delta=DEFAULT_DELTA):
+        self.running = RunningStats(stats, group_by)
+        self.delta = delta
+        self.digests = {}
+
+    def update(self, chunk):
+        self.running.update(chunk)
+        merge_digests(self.digests, build_digests(chunk, self.running.stats, self.running.group_by, self.delta))
+        return self
+
+    def result(self, quantiles=()):
+        return sketch_table(self.digests, self.running, quantiles)
+
+
+def run_chunked(paths, chunksize, make_reports, age='years'):
+    # Feed every chunk to the reports built by make_reports(first_chunk),
+    # reading the input only once; returns the reports and the stat dtypes
+    reports, dtypes = None, None
+    for chunk in iter_chunks(paths, chunksize, age):
+        if reports is None:
+            reports = make_reports(stat_columns(chunk))
+            dtypes = chunk.dtypes
+        for report in reports:
+            report.update(chunk)
+    return reports, dtypes
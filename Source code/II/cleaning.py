@@ -0,0 +1,90 @@
+import hashlib
+import os
+import sys
+import tempfile
+
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'I'))
+from loader import coerce_players, load_players
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache')
+
+
+def split_age(age):
+    # "26-129" -> (26, 129) for a whole column at once
+    parts = age.astype('string').str.split('-', n=1, expand=True)
+    if parts.shape[1] < 2:
+        parts[1] = pd.NA
+    years = pd.to_numeric(parts[0], errors='coerce').astype('float64')
+    days = pd.to_numeric(parts[1], errors='coerce').astype('float64')
+    return years, days
+
+
+def age_in_days(age):
+    years, days = split_age(age)
+    return years * 365 + days
+
+
+def age_in_years(age):
+    years, days = split_age(age)
+    return years + days / 365
+
+
+def age_whole_years(age):
+    years, _ = split_age(age)
+    return years
+
+
+AGE_UNITS = {
+    'days': age_in_days,
+    'years': age_in_years,
+    'whole_years': age_whole_years,
+}
+
+
+def days_to_age(days_total):
+    days_total = pd.to_numeric(days_total, errors='coerce')
+    years = (days_total // 365).astype('Int64').astype('string')
+    days = (days_total % 365).astype('Int64').astype('string')
+    return years + '-' + days
+
+
+def clean_players(df, age='years'):
+    df = coerce_players(df)
+    if 'Age' in df.columns:
+        df['Age'] = AGE_UNITS[age](df['Age'])
+    return df
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_cleaned(csv_path='I/results.csv', age='years', cache_dir=CACHE_DIR):
+    # Cleaned frame cached as Feather, keyed by the source file's content hash
+    name = os.path.splitext(os.path.basename(csv_path))[0]
+    cache_path = os.path.join(cache_dir, f"{name}-{file_hash(csv_path)[:16]}-{age}.feather")
+    if os.path.exists(cache_path):
+        return pd.read_feather(cache_path)
+
+    df = clean_players(load_players(csv_path), age)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        # Written under a unique temp name and renamed into place, so stages
+        # running in parallel never read a half-written cache file
+        fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix='.tmp')
+        os.close(fd)
+        try:
+            df.reset_index(drop=True).to_feather(tmp_path)
+            os.replace(tmp_path, cache_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+    except ImportError:
+        pass
+    return df
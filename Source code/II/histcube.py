@@ -0,0 +1,153 @@
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from cleaning import load_cleaned
+
+ALL_PLAYERS = 'All player'
+CUBE_PATH = 'II/histcube.npz'
+
+
+def build_cube(df_cleaned, stats, group_by='Team', bins=20):
+    # counts[stat, group, bin] with one set of edges per stat shared by every
+    # group, plus per-group n/sum/min/max for the overlays. Group 0 is
+    # 'All player'; missing values are left out rather than counted as 0.
+    df_groups = df_cleaned.dropna(subset=[group_by])
+    groups = [ALL_PLAYERS] + list(df_groups[group_by].unique())
+    values = df_cleaned[stats].to_numpy(dtype='float64', na_value=np.nan)
+    codes = np.full(len(df_cleaned), -1, dtype=np.intp)
+    codes[df_cleaned[group_by].notna().to_numpy()] = pd.Categorical(
+        df_groups[group_by], categories=groups[1:]).codes + 1
+
+    lo = np.nanmin(values, axis=0)
+    hi = np.nanmax(values, axis=0)
+    lo = np.where(np.isnan(lo), 0.0, lo)
+    hi = np.where(np.isnan(hi), 1.0, hi)
+    flat = lo == hi
+    lo, hi = np.where(flat, lo - 0.5, lo), np.where(flat, hi + 0.5, hi)
+    edges = lo[:, None] + (hi - lo)[:, None] * np.linspace(0, 1, bins + 1)
+
+    n_stats, n_groups = len(stats), len(groups)
+    missing = np.isnan(values)
+    # Bin against the stored edges so values sitting on an edge land where
+    # np.histogram(values, edges) would put them
+    idx = np.empty(values.shape, dtype=np.intp)
+    for j in range(n_stats):
+        idx[:, j] = np.searchsorted(edges[j], values[:, j], side='right') - 1
+    idx = np.where(missing, 0, np.clip(idx, 0, bins - 1))
+    stat_idx = np.broadcast_to(np.arange(n_stats), values.shape)
+
+    counts = np.zeros((n_stats, n_groups, bins), dtype=np.uint32)
+    n = np.zeros((n_stats, n_groups), dtype=np.int64)
+    sums = np.zeros((n_stats, n_groups))
+    mins = np.full((n_stats, n_groups), np.inf)
+    maxes = np.full((n_stats, n_groups), -np.inf)
+    filled = np.where(missing, 0.0, values)
+    # Every row counts towards 'All player', and towards its own group if any
+    for rows, group_codes in ((slice(None), np.zeros(len(values), dtype=np.intp)),
+                              (codes >= 0, codes[codes >= 0])):
+        ok = ~missing[rows]
+        g = np.broadcast_to(group_codes[:, None], ok.shape)
+        s = stat_idx[rows]
+        np.add.at(counts, (s[ok], g[ok], idx[rows][ok]), 1)
+        np.add.at(n, (s[ok], g[ok]), 1)
+        np.add.at(sums, (s[ok], g[ok]), filled[rows][ok])
+        np.minimum.at(mins, (s[ok], g[ok]), values[rows][ok])
+        np.maximum.at(maxes, (s[ok], g[ok]), values[rows][ok])
+
+    return HistCube(stats, groups, edges, counts, n, sums, mins, maxes)
+
+
+class HistCube:
+    def __init__(self, stats, groups, edges, counts, n, sums, mins, maxes):
+        self.stats = list(stats)
+        self.groups = list(groups)
+        self.edges = edges
+        self.counts = counts
+        self.n = n
+        self.sums = sums
+        self.mins = mins
+        self.maxes = maxes
+        self.stat_index = {stat: i for i, stat in enumerate(self.stats)}
+        self.group_index = {group: i for i, group in enumerate(self.groups)}
+
+    def distribution(self, stat, group=ALL_PLAYERS):
+        # Everything needed to draw one histogram, straight from the arrays
+        s, g = self.stat_index[stat], self.group_index[group]
+        n = self.n[s, g]
+        return {
+            'stat': stat,
+            'group': group,
+            'counts': self.counts[s, g],
+            'edges': self.edges[s],
+            'n': int(n),
+            'mean': self.sums[s, g] / n if n else np.nan,
+            'min': self.mins[s, g] if n else np.nan,
+            'max': self.maxes[s, g] if n else np.nan,
+        }
+
+    def draw(self, ax, stat, group=ALL_PLAYERS, color='royalblue'):
+        # Bars plus the mean/max overlays IIpart3 puts on its team charts
+        dist = self.distribution(stat, group)
+        edges = dist['edges']
+        ax.bar(edges[:-1], dist['counts'], width=np.diff(edges), align='edge',
+               color=color, edgecolor='white', alpha=0.8)
+        ax.axvline(dist['mean'], color='gold', linestyle='dashed', linewidth=2,
+                   label=f"Medium: {dist['mean']:.1f}")
+        ax.axvline(dist['max'], color='black', linestyle='dotted', linewidth=1,
+                   label=f"Max: {dist['max']:g}")
+        ax.set_title(f'{stat} ({group})', fontsize=12, fontweight='bold')
+        ax.set_xlabel('Value', fontsize=9)
+        ax.set_ylabel('Number of players', fontsize=9)
+        ax.legend()
+        return dist
+
+    def save(self, path=CUBE_PATH):
+        np.savez_compressed(path, stats=np.array(self.stats, dtype=object),
+                            groups=np.array(self.groups, dtype=object),
+                            edges=self.edges, counts=self.counts, n=self.n,
+                            sums=self.sums, mins=self.mins, maxes=self.maxes)
+
+    @classmethod
+    def load(cls, path=CUBE_PATH):
+        data = np.load(path, allow_pickle=True)
+        return cls(list(data['stats']), list(data['groups']), data['edges'], data['counts'],
+                   data['n'], data['sums'], data['mins'], data['maxes'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build or query the stat x team histogram cube')
+    sub = parser.add_subparsers(dest='command', required=True)
+    build = sub.add_parser('build')
+    build.add_argument('--input', default='I/results.csv')
+    build.add_argument('--group-by', choices=['Team', 'Position', 'Nation'], default='Team')
+    build.add_argument('--bins', type=int, default=20)
+    build.add_argument('--output', default=CUBE_PATH)
+    query = sub.add_parser('query')
+    query.add_argument('stat')
+    query.add_argument('--group', default=ALL_PLAYERS)
+    query.add_argument('--cube', default=CUBE_PATH)
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        df_cleaned = load_cleaned(args.input)
+        stats = [col for col in df_cleaned.columns if col not in ['Player', 'Nation', 'Team', 'Position']]
+        cube = build_cube(df_cleaned, stats, args.group_by, args.bins)
+        cube.save(args.output)
+        print(f"Saved {len(cube.stats)} stats x {len(cube.groups)} groups x {args.bins} bins to {args.output}")
+    else:
+        cube = HistCube.load(args.cube)
+        if args.stat not in cube.stat_index:
+            raise SystemExit(f"Unknown stat: {args.stat}")
+        if args.group not in cube.group_index:
+            raise SystemExit(f"Unknown group: {args.group}")
+        dist = cube.distribution(args.stat, args.group)
+        print(f"{dist['stat']} ({dist['group']}): {dist['n']} players, "
+              f"mean {dist['mean']:.2f}, max {dist['max']:g}")
+        for left, right, count in zip(dist['edges'][:-1], dist['edges'][1:], dist['counts']):
+            print(f"  [{left:10.2f}, {right:10.2f})  {count}")
+
+
+if __name__ == "__main__":
+    main()
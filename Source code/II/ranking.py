@@ -0,0 +1,80 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'I'))
+from schema import column_directions
+
+METHODS = ['wins', 'weighted', 'borda', 'zscore']
+
+
+def means_from_aggregate(results_df, group_by='Team'):
+    # group x stat means out of an IIpart2.aggregate / RunningStats table,
+    # without the 'All' row
+    table = results_df.set_index(group_by)
+    table = table.drop(index='All', errors='ignore')
+    mean_cols = [col for col in table.columns if col.startswith('Mean of ')]
+    means = table[mean_cols].apply(pd.to_numeric, errors='coerce')
+    means.columns = [col[len('Mean of '):] for col in mean_cols]
+    return means
+
+
+def orient(means, directions=None):
+    # Flip lower-is-better stats so that larger is always better
+    directions = column_directions() if directions is None else directions
+    signs = np.array([directions.get(stat, 1) for stat in means.columns], dtype='float64')
+    return means.to_numpy(dtype='float64') * signs
+
+
+def rank_matrix(means, directions=None):
+    # team x stat ranks, 1 = best, ties share the best rank, missing -> NaN
+    oriented = pd.DataFrame(orient(means, directions), index=means.index, columns=means.columns)
+    return oriented.rank(ascending=False, method='min')
+
+
+def score(means, method='wins', weights=None, directions=None):
+    # Composite team scores, best first.
+    #   wins:     one point to the best team of every stat (first team on ties)
+    #   weighted: weighted mean of per-stat percentile ranks, 0..1
+    #   borda:    sum of (teams ranked below) per stat
+    #   zscore:   sum of per-stat z-scores
+    # weights is {stat: weight}; stats left out weigh 1 and weight 0 drops a stat.
+    values = orient(means, directions)
+    w = np.array([1.0 if weights is None else weights.get(stat, 1.0) for stat in means.columns])
+    present = ~np.isnan(values)
+    n_teams = present.sum(axis=0)
+
+    if method == 'wins':
+        usable = present.any(axis=0)
+        best = np.nanargmax(np.where(present, values, -np.inf)[:, usable], axis=0)
+        points = np.bincount(best, weights=w[usable], minlength=len(means))
+    elif method in ('weighted', 'borda'):
+        ranks = rank_matrix(means, directions).to_numpy()
+        below = np.nan_to_num(n_teams - ranks)
+        if method == 'borda':
+            points = below @ w
+        else:
+            pct = np.where(present, below / np.maximum(n_teams - 1, 1), 0.0)
+            points = (pct @ w) / (present @ w)
+    elif method == 'zscore':
+        std = np.nanstd(values, axis=0, ddof=1)
+        z = (values - np.nanmean(values, axis=0)) / np.where(std > 0, std, np.inf)
+        points = np.nan_to_num(z) @ w
+    else:
+        raise ValueError(f"Unknown scoring method: {method}")
+
+    return pd.Series(points, index=means.index, name=method).sort_values(ascending=False, kind='stable')
+
+
+def stat_leaders(df, stats, group_by='Team'):
+    # {stat: (best player value, [groups of the players holding it])} in one
+    # max + equality pass over the player x stat matrix
+    values = df[stats].to_numpy(dtype='float64', na_value=np.nan)
+    best = np.nanmax(np.where(np.isnan(values), -np.inf, values), axis=0)
+    holders = (values == best) & df[group_by].notna().to_numpy()[:, None]
+    best = np.where(np.isinf(best), np.nan, best)
+    groups = df[group_by].to_numpy(dtype=object)
+    return {stat: (best[j], pd.unique(groups[holders[:, j]]).tolist())
+            for j, stat in enumerate(stats)}
@@ -0,0 +1,153 @@
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from cleaning import file_hash, load_cleaned
+
+ALL = 'All'
+
+
+class RunningStats:
+    # Per-group count/mean/M2 for every stat, updated batch by batch with the
+    # parallel form of Welford's algorithm (Chan et al.), so aggregates can
+    # absorb newly scraped players without re-reading the whole table.
+    def __init__(self, stats, group_by='Team'):
+        self.stats = list(stats)
+        self.group_by = group_by
+        empty = pd.DataFrame(columns=self.stats, dtype='float64')
+        self.count = empty.copy()
+        self.mean = empty.copy()
+        self.m2 = empty.copy()
+        # sha256 of every input file folded in, so the CLI never counts one twice
+        self.absorbed = []
+
+    def batch_moments(self, df):
+        values = df[self.stats].astype('float64')
+        keys = df[self.group_by].astype(object).where(df[self.group_by].notna(), None)
+        grouped = values.groupby(keys)
+        count = pd.concat([grouped.count(), values.count().to_frame(ALL).T]).astype('float64')
+        mean = pd.concat([grouped.mean(), values.mean().to_frame(ALL).T]).fillna(0.0)
+        var = pd.concat([grouped.var(ddof=0), values.var(ddof=0).to_frame(ALL).T]).fillna(0.0)
+        return count, mean, var * count
+
+    def aligned(self, index):
+        return (self.count.reindex(index, fill_value=0.0),
+                self.mean.reindex(index, fill_value=0.0),
+                self.m2.reindex(index, fill_value=0.0))
+
+    def update(self, df):
+        return self.combine(*self.batch_moments(df))
+
+    def merge(self, other):
+        # Fold in another RunningStats, e.g. one built on a different partition
+        self.absorbed += [h for h in other.absorbed if h not in self.absorbed]
+        return self.combine(other.count, other.mean, other.m2)
+
+    def combine(self, nb, mb, m2b):
+        index = self.count.index.union(nb.index)
+        na, ma, m2a = self.aligned(index)
+        nb, mb, m2b = nb.reindex(index, fill_value=0.0), mb.reindex(index, fill_value=0.0), m2b.reindex(index, fill_value=0.0)
+
+        n = na + nb
+        safe_n = n.where(n > 0, 1.0)
+        delta = mb - ma
+        self.mean = ma + delta * nb / safe_n
+        self.m2 = m2a + m2b + delta ** 2 * na * nb / safe_n
+        self.count = n
+        return self
+
+    def remove(self, df):
+        # Inverse of update, e.g. for rows an incremental scrape replaced
+        nb, mb, m2b = self.batch_moments(df)
+        nc, mc, m2c = self.aligned(self.count.index)
+        nb, mb, m2b = nb.reindex(nc.index, fill_value=0.0), mb.reindex(nc.index, fill_value=0.0), m2b.reindex(nc.index, fill_value=0.0)
+
+        na = (nc - nb).clip(lower=0.0)
+        safe_na = na.where(na > 0, 1.0)
+        ma = ((nc * mc - nb * mb) / safe_na).where(na > 0, 0.0)
+        safe_nc = nc.where(nc > 0, 1.0)
+        m2a = (m2c - m2b - (mb - ma) ** 2 * na * nb / safe_nc).clip(lower=0.0).where(na > 0, 0.0)
+        self.count, self.mean, self.m2 = na, ma, m2a
+        return self
+
+    def result(self):
+        # Mean of / Std of (sample std, like pandas) per group, 'All' first
+        mean = self.mean.where(self.count > 0)
+        std = np.sqrt(self.m2 / (self.count - 1).where(self.count > 1))
+        order = [ALL] + sorted(g for g in self.count.index if g != ALL)
+        columns = {}
+        for attr in self.stats:
+            columns[f'Mean of {attr}'] = mean[attr]
+            columns[f'Std of {attr}'] = std[attr]
+        results_df = pd.DataFrame(columns).reindex(order)
+        return results_df.rename_axis(self.group_by).reset_index()
+
+    def save(self, path):
+        np.savez(path, stats=np.array(self.stats, dtype=object), group_by=self.group_by,
+                 groups=np.array(self.count.index, dtype=object),
+                 count=self.count.to_numpy(), mean=self.mean.to_numpy(), m2=self.m2.to_numpy(),
+                 absorbed=np.array(self.absorbed, dtype=object))
+
+    @classmethod
+    def load(cls, path):
+        data = np.load(path, allow_pickle=True)
+        running = cls(list(data['stats']), str(data['group_by']))
+        groups = list(data['groups'])
+        running.count = pd.DataFrame(data['count'], index=groups, columns=running.stats)
+        running.mean = pd.DataFrame(data['mean'], index=groups, columns=running.stats)
+        running.m2 = pd.DataFrame(data['m2'], index=groups, columns=running.stats)
+        running.absorbed = list(data['absorbed']) if 'absorbed' in data.files else []
+        return running
+
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Fold new players into running mean/std aggregates')
+    parser.add_argument('inputs', nargs='*', help='player CSVs to absorb (default: I/results.csv, '
+                                                  'only when starting a new state)')
+    parser.add_argument('--remove', nargs='*', default=[], help='player CSVs to take back out first')
+    parser.add_argument('--state', default='II/running_stats.npz')
+    parser.add_argument('--group-by', choices=['Team', 'Position', 'Nation'], default='Team')
+    parser.add_argument('--output', default='II/running_results.csv')
+    args = parser.parse_args()
+
+    running = None
+    inputs = args.inputs
+    if os.path.exists(args.state):
+        running = RunningStats.load(args.state)
+        # Re-absorbing the default table on every run would count it again
+        if not inputs and not args.remove:
+            parser.error(f"{args.state} exists; name the new player CSVs to absorb (or --remove)")
+    elif not inputs:
+        inputs = ['I/results.csv']
+    for path in args.remove:
+        digest = file_hash(path)
+        if running is None or digest not in running.absorbed:
+            print(f"Skipping {path}: it was never absorbed")
+            continue
+        running.remove(load_cleaned(path, age='years'))
+        running.absorbed.remove(digest)
+        print(f"Removed players from {path}")
+    for path in inputs:
+        digest = file_hash(path)
+        if running is not None and digest in running.absorbed:
+            print(f"Skipping {path}: already absorbed")
+            continue
+        df = load_cleaned(path, age='years')
+        if running is None:
+            stats = [col for col in df.columns if col not in ['Player', 'Nation', 'Team', 'Position']]
+            running = RunningStats(stats, args.group_by)
+        running.update(df)
+        running.absorbed.append(digest)
+        print(f"Absorbed {len(df)} players from {path}")
+    if running is None:
+        return
+
+    running.save(args.state)
+    running.result().to_csv(args.output, na_rep='N/a', index=True)
+
+
+if __name__ == "__main__":
+    main()
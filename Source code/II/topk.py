@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+
+
+def stat_major(values):
+    # player x stat -> stat x player, contiguous per stat so the partition
+    # below walks memory in order
+    return np.array(values.T, dtype='float64', order='C')
+
+
+def sort_keys(values_t, largest):
+    # Smaller is better and missing sorts last
+    key = -values_t if largest else values_t.copy()
+    key[np.isnan(key)] = np.inf
+    return key
+
+
+def leaders_from_keys(key, k):
+    # Row positions of the k best entries of every row of `key`, best first.
+    # Ties are broken by position like DataFrame.nlargest(keep='first').
+    # Returns (idx, valid), both m x k' with k' = min(k, n); valid is False
+    # where a stat has fewer than k' non-missing entries.
+    m, n = key.shape
+    kk = min(k, n)
+    if kk == 0:
+        return np.empty((m, 0), dtype=np.intp), np.empty((m, 0), dtype=bool)
+
+    # One partition over the whole matrix finds every stat's k-th best value
+    part = np.argpartition(key, kk - 1, axis=1)[:, :kk]
+    kth = np.take_along_axis(key, part, 1).max(axis=1)
+
+    # Keep everything better than it, then only the earliest rows equal to it,
+    # so exactly k' positions per stat survive, already in row order
+    less = key < kth[:, None]
+    equal = key == kth[:, None]
+    needed = kk - less.sum(axis=1)
+    selected = less | (equal & (np.cumsum(equal, axis=1) <= needed[:, None]))
+    idx = np.nonzero(selected)[1].reshape(m, kk)
+    order = np.argsort(np.take_along_axis(key, idx, 1), axis=1, kind='stable')
+    idx = np.take_along_axis(idx, order, 1)
+
+    valid = np.take_along_axis(key, idx, 1) != np.inf
+    return idx, valid
+
+
+def leaders(values, k, largest=True):
+    # values: n x m float matrix with NaN for missing; see leaders_from_keys
+    return leaders_from_keys(sort_keys(stat_major(values), largest), k)
+
+
+def top_bottom_k(df, stats, k=3):
+    # {stat: (top positions, bottom positions)} as iloc positions into df
+    values_t = stat_major(df[stats].to_numpy(dtype='float64', na_value=np.nan))
+    top, top_valid = leaders_from_keys(sort_keys(values_t, largest=True), k)
+    bottom, bottom_valid = leaders_from_keys(sort_keys(values_t, largest=False), k)
+    return {
+        stat: (top[j][top_valid[j]], bottom[j][bottom_valid[j]])
+        for j, stat in enumerate(stats)
+    }
+
+
+def grouped_top_bottom_k(df, stats, group_by, k=3):
+    # {group: {stat: (top positions, bottom positions)}}; rows with a missing
+    # group are left out
+    codes, groups = pd.factorize(df[group_by], sort=True)
+    values = df[stats].to_numpy(dtype='float64', na_value=np.nan)
+    order = np.argsort(codes, kind='stable')
+    counts = np.bincount(codes[codes >= 0], minlength=len(groups))
+    start = int((codes < 0).sum())
+
+    # Lay every group out as one block of columns; each stat's slice of a
+    # block is still contiguous, so no per-group copies are needed
+    values_t = stat_major(values[order])
+    top_keys = sort_keys(values_t, largest=True)
+    bottom_keys = sort_keys(values_t, largest=False)
+
+    result = {}
+    for g, group in enumerate(groups):
+        block = slice(start, start + counts[g])
+        rows = order[block]
+        start += counts[g]
+        top, top_valid = leaders_from_keys(top_keys[:, block], k)
+        bottom, bottom_valid = leaders_from_keys(bottom_keys[:, block], k)
+        result[group] = {
+            stat: (rows[top[j][top_valid[j]]], rows[bottom[j][bottom_valid[j]]])
+            for j, stat in enumerate(stats)
+        }
+    return result
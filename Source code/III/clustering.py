@@ -0,0 +1,132 @@
+import argparse
+
+import numpy as np
+import pandas as pd
+from sklearn.cluster import KMeans
+from sklearn.decomposition import PCA
+
+from features import FEATURES, load_players, fit_preprocess, to_number
+from ksweep import find_optimal_k
+
+MODEL_PATH = 'player_clusters.npz'
+# Fitted arrays written by save(); plain npz, so loading does not depend on
+# the module the model was saved from (a pickle from the CLI would point at
+# __main__.PlayerClusters)
+STATE = ['fill', 'mean', 'scale', 'centroids', 'counts', 'pca_mean', 'pca_components', 'explained_variance']
+
+
+class PlayerClusters:
+    # The notebook's imputer -> scaler -> KMeans -> PCA chain as one object
+    # that can be saved, so new players are assigned to a role cluster by a
+    # nearest-centroid lookup instead of refitting the whole league.
+    def __init__(self, k=None, features=FEATURES, random_state=42, n_init=10):
+        self.k = k
+        self.features = list(features)
+        self.random_state = random_state
+        self.n_init = n_init
+
+    def fit(self, players):
+        X_scaled, imputer, scaler = fit_preprocess(players, self.features)
+        self.fill, self.mean, self.scale = imputer.statistics_, scaler.mean_, scaler.scale_
+        if self.k is None:
+            self.k = find_optimal_k(X_scaled, random_state=self.random_state, n_init=self.n_init)['best_k']
+        kmeans = KMeans(n_clusters=self.k, random_state=self.random_state, n_init=self.n_init)
+        self.labels_ = kmeans.fit_predict(X_scaled)
+        self.centroids = kmeans.cluster_centers_
+        self.counts = np.bincount(self.labels_, minlength=self.k).astype('float64')
+
+        pca = PCA(n_components=2)
+        pca.fit(X_scaled)
+        self.pca_mean = pca.mean_
+        self.pca_components = pca.components_
+        self.explained_variance = pca.explained_variance_ratio_
+        return self
+
+    def transform(self, players):
+        # Raw stats (strings like "2,340" allowed) -> standardized features.
+        # Applies the fitted imputer/scaler parameters directly; sklearn's
+        # own transform validation costs milliseconds per call.
+        values = np.column_stack([to_number(players[col]).to_numpy(dtype='float64', na_value=np.nan)
+                                  for col in self.features])
+        values = np.where(np.isnan(values), self.fill, values)
+        return (values - self.mean) / self.scale
+
+    def assign(self, X_scaled):
+        d2 = ((X_scaled[:, None, :] - self.centroids[None, :, :]) ** 2).sum(axis=2)
+        return d2.argmin(axis=1)
+
+    def predict(self, players):
+        return self.assign(self.transform(players))
+
+    def predict_one(self, stats):
+        # Cluster of a single player given as a dict/Series of raw stats,
+        # skipping pandas entirely
+        values = np.array([np.nan if pd.isna(stats.get(col)) else float(str(stats[col]).replace(',', ''))
+                           for col in self.features])
+        values = np.where(np.isnan(values), self.fill, values)
+        return int(self.assign(((values - self.mean) / self.scale)[None, :])[0])
+
+    def partial_fit(self, players):
+        # MiniBatchKMeans-style update: every centroid moves towards the mean
+        # of its new members with step n_new / (n_seen + n_new)
+        X_scaled = self.transform(players)
+        labels = self.assign(X_scaled)
+        n_new = np.bincount(labels, minlength=self.k).astype('float64')
+        sums = np.zeros_like(self.centroids)
+        np.add.at(sums, labels, X_scaled)
+        moved = n_new > 0
+        self.counts += n_new
+        self.centroids[moved] += (sums[moved] - n_new[moved, None] * self.centroids[moved]) / self.counts[moved, None]
+        return labels
+
+    def project(self, players):
+        # 2-D PCA coordinates for the player map
+        return (self.transform(players) - self.pca_mean) @ self.pca_components.T
+
+    def save(self, path=MODEL_PATH):
+        np.savez(path, k=self.k, features=np.array(self.features), random_state=self.random_state,
+                 n_init=self.n_init, **{name: getattr(self, name) for name in STATE})
+
+    @classmethod
+    def load(cls, path=MODEL_PATH):
+        data = np.load(path)
+        model = cls(int(data['k']), [str(f) for f in data['features']], int(data['random_state']), int(data['n_init']))
+        for name in STATE:
+            setattr(model, name, data[name])
+        return model
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Fit the player role clusters or assign new players to them')
+    sub = parser.add_subparsers(dest='command', required=True)
+    fit = sub.add_parser('fit')
+    fit.add_argument('--input', default='results.csv')
+    fit.add_argument('-k', type=int, help='number of clusters (default: find_optimal_k)')
+    fit.add_argument('--output', default='players_clustered.csv')
+    fit.add_argument('--model', default=MODEL_PATH)
+    assign = sub.add_parser('assign')
+    assign.add_argument('input', help='CSV of new players in the scraper format')
+    assign.add_argument('--update', action='store_true', help='move the centroids towards the new players and save')
+    assign.add_argument('--model', default=MODEL_PATH)
+    args = parser.parse_args()
+
+    if args.command == 'fit':
+        players = load_players(args.input)
+        model = PlayerClusters(args.k).fit(players)
+        model.save(args.model)
+        players_with_clusters = players.copy()
+        players_with_clusters['Cluster'] = model.labels_
+        players_with_clusters.to_csv(args.output, index=False)
+        print(f"{model.k} clusters fitted on {len(players)} players, saved to {args.model}")
+    else:
+        model = PlayerClusters.load(args.model)
+        players = load_players(args.input)
+        labels = model.partial_fit(players) if args.update else model.predict(players)
+        for (_, row), label in zip(players.iterrows(), labels):
+            print(f"{row['Player']} ({row['Team']}): cluster {label}")
+        if args.update:
+            model.save(args.model)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+import argparse
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+from features import FEATURES, load_players, fit_preprocess
+
+STORE_PATH = 'distances.npy'
+# Bytes of float32 distances a block of rows may hold in memory at once
+BLOCK_BYTES = 64 << 20
+# Columns per float32 product before it is added to the float64 sums
+SUM_COLUMNS = 8192
+
+
+def meta_path(path):
+    return path[:-len('.npy')] + '_meta.npz' if path.endswith('.npy') else path + '_meta.npz'
+
+
+def row_hashes(values):
+    # One digest per player's raw feature vector, to spot changed rows
+    values = np.ascontiguousarray(values, dtype=np.float64)
+    return np.array([hashlib.sha1(row.tobytes()).hexdigest() for row in values])
+
+
+def rows_per_block(n, block=None):
+    # Rows of an n-column float32 block that fit in BLOCK_BYTES
+    return block or max(1, BLOCK_BYTES // (4 * max(n, 1)))
+
+
+def block_distances(A, B, b_norms):
+    # Euclidean distances between the rows of A and B through one BLAS product
+    a_norms = np.einsum('ij,ij->i', A, A)
+    d2 = a_norms[:, None] + b_norms[None, :] - 2 * (A @ B.T)
+    return np.sqrt(np.maximum(d2, 0)).astype(np.float32)
+
+
+class DistanceStore:
+    # Player x player Euclidean distances on the standardized clustering
+    # features, as a float32 .npy that every process can np.load with
+    # mmap_mode='r'. The imputer/scaler parameters are frozen at build time
+    # so that changing a few players only rewrites their rows and columns.
+    def __init__(self, path, D, fill, mean, scale, hashes):
+        self.path = path
+        self.D = D
+        self.fill = fill
+        self.mean = mean
+        self.scale = scale
+        self.hashes = hashes
+
+    def standardize(self, values):
+        values = np.where(np.isnan(values), self.fill, values)
+        return ((values - self.mean) / self.scale).astype(np.float32)
+
+    @classmethod
+    def build(cls, players, path=STORE_PATH, block=None):
+        values = players[FEATURES].to_numpy(dtype='float64', na_value=np.nan)
+        _, imputer, scaler = fit_preprocess(players)
+        n = len(values)
+        D = np.lib.format.open_memmap(path, mode='w+', dtype=np.float32, shape=(n, n))
+        store = cls(path, D, imputer.statistics_, scaler.mean_, scaler.scale_, row_hashes(values))
+        X = store.standardize(values)
+        norms = np.einsum('ij,ij->i', X, X)
+        block = rows_per_block(n, block)
+        for start in range(0, n, block):
+            stop = min(start + block, n)
+            D[start:stop] = block_distances(X[start:stop], X, norms)
+            D[np.arange(start, stop), np.arange(start, stop)] = 0
+        D.flush()
+        store.save_meta()
+        return store
+
+    @classmethod
+    def open(cls, path=STORE_PATH, mode='r'):
+        meta = np.load(meta_path(path))
+        D = np.load(path, mmap_mode=mode)
+        return cls(path, D, meta['fill'], meta['mean'], meta['scale'], meta['hashes'])
+
+    def save_meta(self):
+        np.savez(meta_path(self.path), fill=self.fill, mean=self.mean, scale=self.scale, hashes=self.hashes)
+
+    def update(self, players):
+        # Recompute only the rows (and matching columns) whose raw features
+        # changed; the player list must be the same, in the same order
+        values = players[FEATURES].to_numpy(dtype='float64', na_value=np.nan)
+        if len(values) != len(self.D):
+            raise ValueError("Player count changed; rebuild the distance store")
+        hashes = row_hashes(values)
+        changed = np.flatnonzero(hashes != self.hashes)
+        if len(changed):
+            D = np.load(self.path, mmap_mode='r+')
+            X = self.standardize(values)
+            rows = block_distances(X[changed], X, np.einsum('ij,ij->i', X, X))
+            rows[np.arange(len(changed)), changed] = 0
+            D[changed] = rows
+            D[:, changed] = rows.T
+            D.flush()
+            self.D = np.load(self.path, mmap_mode='r')
+            self.hashes = hashes
+            self.save_meta()
+        return changed
+
+    def cluster_sums(self, labels, block=None):
+        # n x k sums of distances from every player to each cluster. Blocks
+        # of the store are multiplied in float32 as they are (no float64 copy)
+        # and only the small n x k partial sums accumulate in float64.
+        labels = np.asarray(labels)
+        n, k = len(labels), labels.max() + 1
+        onehot = np.zeros((n, k), dtype=np.float32)
+        onehot[np.arange(n), labels] = 1
+        sums = np.zeros((n, k))
+        block = rows_per_block(n, block)
+        for start in range(0, n, block):
+            rows = self.D[start:start + block]
+            for col in range(0, n, SUM_COLUMNS):
+                sums[start:start + block] += rows[:, col:col + SUM_COLUMNS] @ onehot[col:col + SUM_COLUMNS]
+        return sums, np.bincount(labels, minlength=k).astype(np.float64)
+
+    def silhouette(self, labels, block=None):
+        # Mean silhouette from the stored distances, same definition as
+        # sklearn.metrics.silhouette_score
+        labels = np.asarray(labels)
+        sums, counts = self.cluster_sums(labels, block)
+        rows = np.arange(len(labels))
+        own = counts[labels] - 1
+        a = np.where(own > 0, sums[rows, labels] / np.maximum(own, 1), 0)
+        means = sums / np.maximum(counts, 1)
+        # Labels with no members are never the nearest other cluster
+        means[:, counts == 0] = np.inf
+        means[rows, labels] = np.inf
+        b = means.min(axis=1)
+        s = np.where(own > 0, (b - a) / np.maximum(a, b), 0)
+        return float(s.mean())
+
+    def medoids(self, labels, block=None):
+        # {cluster: row of the player with the smallest total distance to the
+        # rest of their cluster}; labels with no members are skipped
+        labels = np.asarray(labels)
+        sums, counts = self.cluster_sums(labels, block)
+        within = sums[np.arange(len(labels)), labels]
+        return {c: int(np.flatnonzero(labels == c)[within[labels == c].argmin()])
+                for c in range(labels.max() + 1) if counts[c] > 0}
+
+    def neighbours(self, row, k=10):
+        d = np.array(self.D[row])
+        d[row] = np.inf
+        # Everyone else is a neighbour when k reaches n - 1
+        k = min(k, len(d) - 1)
+        if k <= 0:
+            return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.float32)
+        part = np.argpartition(d, k)[:k]
+        order = part[np.argsort(d[part], kind='stable')]
+        return order, d[order]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build and query the player distance store')
+    sub = parser.add_subparsers(dest='command', required=True)
+    for name in ('build', 'update'):
+        command = sub.add_parser(name)
+        command.add_argument('--input', default='results.csv')
+        command.add_argument('--store', default=STORE_PATH)
+    clusters = sub.add_parser('clusters', help='silhouette and medoids of a clustering')
+    clusters.add_argument('--labels', default='players_clustered.csv', help='CSV with a Cluster column')
+    clusters.add_argument('--store', default=STORE_PATH)
+    near = sub.add_parser('neighbours')
+    near.add_argument('player')
+    near.add_argument('-k', type=int, default=10)
+    near.add_argument('--input', default='results.csv')
+    near.add_argument('--store', default=STORE_PATH)
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        store = DistanceStore.build(load_players(args.input), args.store)
+        print(f"Stored {len(store.D)} x {len(store.D)} distances in {args.store}")
+    elif args.command == 'update':
+        changed = DistanceStore.open(args.store).update(load_players(args.input))
+        print(f"Recomputed {len(changed)} rows")
+    elif args.command == 'clusters':
+        clustered = pd.read_csv(args.labels)
+        store = DistanceStore.open(args.store)
+        labels = clustered['Cluster'].to_numpy()
+        print(f"Silhouette score: {store.silhouette(labels):.3f}")
+        for cluster, row in store.medoids(labels).items():
+            print(f"Cluster {cluster} medoid: {clustered.loc[row, 'Player']} ({clustered.loc[row, 'Team']})")
+    else:
+        players = load_players(args.input)
+        store = DistanceStore.open(args.store)
+        rows = np.flatnonzero(players['Player'].str.lower() == args.player.lower())
+        if len(rows) == 0:
+            raise SystemExit(f"Unknown player: {args.player}")
+        row = int(rows[0])
+        rows, dist = store.neighbours(row, args.k)
+        for r, d in zip(rows, dist):
+            print(f"{players.loc[r, 'Player']:<28} {players.loc[r, 'Team']:<18} {d:.3f}")
+
+
+if __name__ == "__main__":
+    main()
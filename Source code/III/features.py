@@ -0,0 +1,43 @@
+import pandas as pd
+from sklearn.preprocessing import StandardScaler
+from sklearn.impute import SimpleImputer
+
+# Key performance metrics used for player clustering (same as III.ipynb)
+FEATURES = [
+    'Goals', 'Assists', 'Minutes', 'Expected Goals',
+    'Goals Scored per 90 minutes', 'Assists per 90 minutes',
+    'Shots on target per 90 minutes', 'Progressive Carries in Progression',
+    'Progressive Passes in Progression', 'Pass Completion Percentage',
+    'Tackles', 'Interceptions', 'Blocks'
+]
+
+
+def to_number(values):
+    # "2,340" -> 2340.0; numbers and NaN pass through
+    if pd.api.types.is_numeric_dtype(values):
+        return values.astype('float64')
+    return pd.to_numeric(values.astype(str).str.replace(',', '', regex=False), errors='coerce')
+
+
+def load_players(file_path, extra=()):
+    data = pd.read_csv(file_path, na_values=['N/a'])
+    players = data[['Player', 'Position', 'Team'] + list(extra) + FEATURES].copy()
+    for col in FEATURES:
+        players[col] = to_number(players[col])
+    return players
+
+
+def fit_preprocess(players, features=FEATURES):
+    # Mean imputation then standard scaling, as in the notebook; the fitted
+    # imputer and scaler are returned so new players can be transformed alike
+    imputer = SimpleImputer(strategy='mean')
+    X = imputer.fit_transform(players[features])
+    scaler = StandardScaler()
+    X_scaled = scaler.fit_transform(X)
+    return X_scaled, imputer, scaler
+
+
+def preprocess_data(file_path):
+    players = load_players(file_path)
+    X_scaled, _, _ = fit_preprocess(players)
+    return players, X_scaled, FEATURES
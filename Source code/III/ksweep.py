@@ -0,0 +1,178 @@
+import argparse
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from sklearn.cluster import KMeans, MiniBatchKMeans
+from sklearn.metrics import silhouette_score
+
+from features import preprocess_data
+from distances import DistanceStore
+
+
+def make_model(k, init, n_init, random_state, minibatch, batch_size=1024):
+    if minibatch:
+        return MiniBatchKMeans(n_clusters=k, init=init, n_init=n_init, batch_size=batch_size,
+                               random_state=random_state)
+    return KMeans(n_clusters=k, init=init, n_init=n_init, random_state=random_state)
+
+
+def score_labels(X, labels, sample_size, random_state, distances=None):
+    # Exact silhouette is O(n^2); on a sample of sample_size rows it is
+    # O(sample_size * n) with a standard error of roughly 1/sqrt(sample_size).
+    # With a distance store (distances.py) the exact score reuses the stored
+    # matrix instead of recomputing it for every k.
+    if distances is not None:
+        return DistanceStore.open(distances).silhouette(labels)
+    if sample_size is not None and sample_size >= len(X):
+        sample_size = None
+    return silhouette_score(X, labels, sample_size=sample_size, random_state=random_state)
+
+
+def fit_k(X, k, random_state=42, n_init=10, minibatch=False, sample_size=None, init='k-means++', distances=None):
+    model = make_model(k, init, n_init if isinstance(init, str) else 1, random_state, minibatch)
+    model.fit(X)
+    silhouette = score_labels(X, model.labels_, sample_size, random_state, distances)
+    return k, model.inertia_, silhouette, model.cluster_centers_
+
+
+def grow_centers(X, centers, rng):
+    # One k-means++ step: add a point drawn with probability ~ squared
+    # distance to the nearest existing centre
+    d2 = np.min([((X - c) ** 2).sum(axis=1) for c in centers], axis=0)
+    total = d2.sum()
+    pick = rng.choice(len(X), p=d2 / total) if total > 0 else rng.integers(len(X))
+    return np.vstack([centers, X[pick]])
+
+
+def sweep(X, max_k=10, random_state=42, n_init=10, workers=None, minibatch=False,
+          sample_size=None, warm_start=False, distances=None):
+    # (ks, inertia, silhouette) for k = 2..max_k.
+    # warm_start runs the ks in order, seeding k from the k-1 centroids plus
+    # one k-means++ point (a single init per k); otherwise every k is an
+    # independent cold fit and they run in parallel processes.
+    ks = list(range(2, max_k + 1))
+    results = {}
+    if warm_start:
+        rng = np.random.default_rng(random_state)
+        centers = X[[rng.integers(len(X))]]
+        for k in ks:
+            centers = grow_centers(X, centers, rng)
+            _, inertia, silhouette, centers = fit_k(X, k, random_state, 1, minibatch, sample_size, centers, distances)
+            results[k] = (inertia, silhouette)
+    elif workers == 1:
+        for k in ks:
+            _, inertia, silhouette, _ = fit_k(X, k, random_state, n_init, minibatch, sample_size,
+                                              distances=distances)
+            results[k] = (inertia, silhouette)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(fit_k, X, k, random_state, n_init, minibatch, sample_size,
+                                   distances=distances) for k in ks]
+            for future in futures:
+                k, inertia, silhouette, _ = future.result()
+                results[k] = (inertia, silhouette)
+    inertia = [results[k][0] for k in ks]
+    silhouette_scores = [results[k][1] for k in ks]
+    return ks, inertia, silhouette_scores
+
+
+def choose_k(inertia, silhouette_scores):
+    # Same rule as the notebook's find_optimal_k
+    diffs = np.diff(inertia)
+    elbow_point = np.argmax(np.diff(diffs)) + 2
+    best_silhouette_k = np.argmax(silhouette_scores) + 2
+    return {
+        'elbow_k': elbow_point,
+        'silhouette_k': best_silhouette_k,
+        'best_k': max(3, min((elbow_point + best_silhouette_k) // 2, 7)),
+        'silhouette_scores': silhouette_scores
+    }
+
+
+def plot_sweep(ks, inertia, silhouette_scores, path="K-Means.png"):
+    from matplotlib.figure import Figure
+    fig = Figure(figsize=(12, 5))
+    ax = fig.add_subplot(1, 2, 1)
+    ax.plot(ks, inertia, marker='o')
+    ax.set_title('Elbow Method')
+    ax.set_xlabel('Number of clusters (K)')
+    ax.set_ylabel('Inertia')
+    ax.grid(True)
+    ax = fig.add_subplot(1, 2, 2)
+    ax.plot(ks, silhouette_scores, marker='o')
+    ax.set_title('Silhouette Method')
+    ax.set_xlabel('Number of clusters (K)')
+    ax.set_ylabel('Silhouette Score')
+    ax.grid(True)
+    fig.tight_layout()
+    fig.savefig(path)
+
+
+def find_optimal_k(X, max_k=10, random_state=42, n_init=10, workers=None, minibatch=False,
+                   sample_size=None, warm_start=False, plot_path=None, distances=None):
+    # Drop-in for the notebook function; the defaults give the same fits
+    ks, inertia, silhouette_scores = sweep(X, max_k, random_state, n_init, workers, minibatch,
+                                           sample_size, warm_start, distances)
+    if plot_path:
+        plot_sweep(ks, inertia, silhouette_scores, plot_path)
+    return choose_k(inertia, silhouette_scores)
+
+
+def synthetic(X, n, random_state=0):
+    # n players resampled from the real ones with a little jitter
+    rng = np.random.default_rng(random_state)
+    rows = rng.integers(len(X), size=n)
+    return X[rows] + rng.normal(scale=0.05, size=(n, X.shape[1]))
+
+
+def benchmark(X, sizes, max_k=10, workers=None, exact_limit=20000):
+    modes = [
+        ('exact', dict()),
+        ('parallel+sampled', dict(workers=workers, sample_size=5000)),
+        ('minibatch+sampled', dict(workers=workers, minibatch=True, sample_size=5000)),
+        ('warm+minibatch+sampled', dict(minibatch=True, sample_size=5000, warm_start=True)),
+    ]
+    print(f"{'players':>8}  {'mode':<24} {'seconds':>8}  best_k")
+    for n in sizes:
+        data = X if n == len(X) else synthetic(X, n)
+        for name, options in modes:
+            if name == 'exact' and n > exact_limit:
+                print(f"{n:>8}  {name:<24} {'skipped':>8}  (O(n^2) silhouette)")
+                continue
+            options = dict(options)
+            options.setdefault('workers', 1)
+            start = time.perf_counter()
+            result = find_optimal_k(data, max_k, **options)
+            print(f"{n:>8}  {name:<24} {time.perf_counter() - start:8.2f}  {result['best_k']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Sweep K for the player clustering')
+    parser.add_argument('--input', default='results.csv')
+    parser.add_argument('--max-k', type=int, default=10)
+    parser.add_argument('--workers', type=int, help='processes for the k values (default: all cores)')
+    parser.add_argument('--minibatch', action='store_true', help='MiniBatchKMeans instead of KMeans')
+    parser.add_argument('--sample-size', type=int, help='rows used for the silhouette score')
+    parser.add_argument('--warm-start', action='store_true', help='seed each k from the k-1 centroids')
+    parser.add_argument('--distances', metavar='STORE', help='exact silhouette from a distances.py store')
+    parser.add_argument('--plot', default='K-Means.png')
+    parser.add_argument('--benchmark', type=int, nargs='*', metavar='N',
+                        help='time every mode on N players (default 490 5000 20000 100000)')
+    args = parser.parse_args()
+
+    players, X_scaled, features = preprocess_data(args.input)
+    if args.benchmark is not None:
+        benchmark(X_scaled, args.benchmark or [len(X_scaled), 5000, 20000, 100000], args.max_k, args.workers)
+        return
+
+    result = find_optimal_k(X_scaled, args.max_k, workers=args.workers, minibatch=args.minibatch,
+                            sample_size=args.sample_size, warm_start=args.warm_start, plot_path=args.plot,
+                            distances=args.distances)
+    print(f"Elbow method suggested: {result['elbow_k']} clusters")
+    print(f"Silhouette method suggested: {result['silhouette_k']} clusters")
+    print(f"Optimal number of clusters: {result['best_k']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+import argparse
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+from sklearn.decomposition import PCA, IncrementalPCA
+from sklearn.preprocessing import StandardScaler
+
+from features import FEATURES, to_number
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'I'))
+from loader import partition_paths
+
+MODEL_PATH = 'pca_model.npz'
+MAP_PATH = 'player_map.npz'
+
+
+def iter_chunks(paths, chunksize=50000):
+    # (id columns, float feature matrix) per chunk of every input CSV
+    for path in paths:
+        for data in pd.read_csv(path, na_values=['N/a'], chunksize=chunksize):
+            values = np.column_stack([to_number(data[col]).to_numpy(dtype='float64', na_value=np.nan)
+                                      for col in FEATURES])
+            yield data[['Player', 'Position', 'Team']].reset_index(drop=True), values
+
+
+class Projection:
+    # Mean imputation + standard scaling + 2-D PCA, fitted chunk by chunk and
+    # kept as plain arrays so projecting players is one matrix multiply
+    def __init__(self, fill, mean, scale, components, explained_variance, features=FEATURES):
+        self.fill = fill
+        self.mean = mean
+        self.scale = scale
+        self.components = components
+        self.explained_variance = explained_variance
+        self.features = list(features)
+
+    def standardize(self, values):
+        values = np.where(np.isnan(values), self.fill, values)
+        return (values - self.mean) / self.scale
+
+    def project(self, values):
+        # Components are fitted on centred data, and standardized data is
+        # already centred, so no PCA mean is needed
+        return (self.standardize(values) @ self.components.T).astype(np.float32)
+
+    @classmethod
+    def fit(cls, paths, chunksize=50000, method='incremental', n_components=2, random_state=42):
+        # Pass 1: per-feature mean/variance ignoring missing values. The
+        # notebook scales after mean imputation, which shrinks the variance
+        # by n_present / n_total; the same correction is applied here.
+        scaler = StandardScaler()
+        total = 0
+        for _, values in iter_chunks(paths, chunksize):
+            scaler.partial_fit(values)
+            total += len(values)
+        present = np.broadcast_to(scaler.n_samples_seen_, scaler.mean_.shape)
+        scale = np.sqrt(scaler.var_ * present / total)
+        scale = np.where(scale > 0, scale, 1.0)
+        projection = cls(scaler.mean_, scaler.mean_, scale, None, None)
+
+        # Pass 2: the components
+        if method == 'incremental':
+            pca = IncrementalPCA(n_components=n_components)
+            pending = None
+            for _, values in iter_chunks(paths, chunksize):
+                X = projection.standardize(values)
+                pending = X if pending is None else np.vstack([pending, X])
+                # partial_fit needs at least n_components rows per call
+                if len(pending) >= max(n_components, 1000):
+                    pca.partial_fit(pending)
+                    pending = None
+            if pending is not None:
+                pca.partial_fit(pending)
+        else:
+            X = np.vstack([projection.standardize(values) for _, values in iter_chunks(paths, chunksize)])
+            solver = 'randomized' if method == 'randomized' else 'full'
+            pca = PCA(n_components=n_components, svd_solver=solver, random_state=random_state).fit(X)
+        projection.components = pca.components_
+        projection.explained_variance = pca.explained_variance_ratio_
+        return projection
+
+    def save(self, path=MODEL_PATH):
+        np.savez(path, fill=self.fill, mean=self.mean, scale=self.scale, components=self.components,
+                 explained_variance=self.explained_variance, features=np.array(self.features, dtype=object))
+
+    @classmethod
+    def load(cls, path=MODEL_PATH):
+        data = np.load(path, allow_pickle=True)
+        return cls(data['fill'], data['mean'], data['scale'], data['components'],
+                   data['explained_variance'], list(data['features']))
+
+
+def write_map(projection, paths, output=MAP_PATH, chunksize=50000):
+    # Compact player map: float32 coordinates plus the id columns
+    ids, coords = [], []
+    for meta, values in iter_chunks(paths, chunksize):
+        ids.append(meta)
+        coords.append(projection.project(values))
+    meta = pd.concat(ids, ignore_index=True)
+    np.savez(output, xy=np.vstack(coords),
+             player=meta['Player'].to_numpy(dtype=object), position=meta['Position'].to_numpy(dtype=object),
+             team=meta['Team'].to_numpy(dtype=object), explained_variance=projection.explained_variance)
+    return len(meta)
+
+
+def input_paths(args):
+    if args.partitions:
+        return [path for _, _, path in partition_paths(args.partitions)]
+    return args.input
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Fit and apply the 2-D PCA player map')
+    sub = parser.add_subparsers(dest='command', required=True)
+    for name in ('fit', 'project'):
+        command = sub.add_parser(name)
+        command.add_argument('--input', nargs='+', default=['results.csv'])
+        command.add_argument('--partitions', metavar='ROOT', help='use every crawl partition under ROOT instead')
+        command.add_argument('--chunksize', type=int, default=50000)
+        command.add_argument('--model', default=MODEL_PATH)
+        command.add_argument('--output', default=MAP_PATH)
+    sub.choices['fit'].add_argument('--method', choices=['incremental', 'randomized', 'full'], default='incremental')
+    args = parser.parse_args()
+
+    paths = input_paths(args)
+    if args.command == 'fit':
+        projection = Projection.fit(paths, args.chunksize, args.method)
+        projection.save(args.model)
+        print(f"Explained variance: {', '.join(f'{v:.1%}' for v in projection.explained_variance)}")
+    else:
+        projection = Projection.load(args.model)
+    count = write_map(projection, paths, args.output, args.chunksize)
+    print(f"Projected {count} players into {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+import argparse
+import difflib
+
+import numpy as np
+import pandas as pd
+
+from features import FEATURES, load_players, fit_preprocess
+
+INDEX_PATH = 'similarity_index.npz'
+
+
+class SimilarityIndex:
+    # Exact nearest neighbours by Euclidean distance in the standardized
+    # feature space used for clustering. Vectors are kept as one contiguous
+    # float32 matrix with precomputed squared norms, so a lookup is a single
+    # BLAS matrix-vector product plus an argpartition.
+    def __init__(self, X, players, features=FEATURES):
+        self.X = np.ascontiguousarray(X, dtype=np.float32)
+        self.norms = np.einsum('ij,ij->i', self.X, self.X)
+        self.players = players.reset_index(drop=True)
+        self.features = list(features)
+        self.columns = {col: self.players[col].to_numpy(dtype=object) for col in ['Player', 'Team', 'Position']}
+        self.names = self.players['Player'].str.lower().to_numpy()
+        self.minutes = self.players['Minutes'].to_numpy(dtype='float64', na_value=np.nan)
+        self.positions = self.players['Position'].fillna('').str.split(',')
+        self.position_masks = {}
+
+    @classmethod
+    def build(cls, file_path='results.csv'):
+        players = load_players(file_path)
+        X_scaled, _, _ = fit_preprocess(players)
+        return cls(X_scaled, players)
+
+    def locate(self, player, team=None):
+        rows = np.flatnonzero(self.names == player.lower())
+        if team is not None:
+            rows = rows[self.columns['Team'][rows] == team]
+        if len(rows) == 0:
+            raise KeyError(f"Player not found: {player}" + (f" ({team})" if team else ''))
+        return rows[0]
+
+    def close_names(self, player, n=5):
+        # Spellings in the index nearest to an unknown name, for error messages
+        matches = difflib.get_close_matches(player.lower(), list(dict.fromkeys(self.names)), n=n, cutoff=0.6)
+        return [self.columns['Player'][np.flatnonzero(self.names == name)[0]] for name in matches]
+
+    def mask(self, position=None, min_minutes=None):
+        keep = np.ones(len(self.X), dtype=bool)
+        if position:
+            if position not in self.position_masks:
+                self.position_masks[position] = self.positions.apply(lambda p: position in p).to_numpy()
+            keep &= self.position_masks[position]
+        if min_minutes is not None:
+            keep &= self.minutes >= min_minutes
+        return keep
+
+    def search(self, queries, k=10, position=None, min_minutes=None, exclude=None):
+        # queries: q x d standardized vectors -> (rows, distances), both q x k,
+        # nearest first; exclude holds one row per query to leave out (itself)
+        Q = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        d2 = self.norms[None, :] - 2 * (Q @ self.X.T) + np.einsum('ij,ij->i', Q, Q)[:, None]
+        keep = self.mask(position, min_minutes)
+        d2[:, ~keep] = np.inf
+        if exclude is not None:
+            d2[np.arange(len(Q)), exclude] = np.inf
+        kk = min(k, int(keep.sum()))
+        if kk == 0:
+            return np.empty((len(Q), 0), dtype=np.intp), np.empty((len(Q), 0), dtype=np.float32)
+        part = np.argpartition(d2, kk - 1, axis=1)[:, :kk]
+        order = np.argsort(np.take_along_axis(d2, part, 1), axis=1, kind='stable')
+        rows = np.take_along_axis(part, order, 1)
+        dist = np.sqrt(np.maximum(np.take_along_axis(d2, rows, 1), 0))
+        valid = np.isfinite(dist)
+        return np.where(valid, rows, -1), dist
+
+    def neighbours(self, player, k=10, team=None, position=None, min_minutes=None):
+        # [(player, team, position, minutes, distance)] nearest first; plain
+        # tuples keep a lookup well under a millisecond
+        row = self.locate(player, team)
+        rows, dist = self.search(self.X[row], k, position, min_minutes, exclude=[row])
+        return [(self.columns['Player'][r], self.columns['Team'][r], self.columns['Position'][r],
+                 self.minutes[r], float(d))
+                for r, d in zip(rows[0], dist[0]) if r >= 0]
+
+    def similar(self, player, k=10, team=None, position=None, min_minutes=None):
+        # Same as neighbours, as a DataFrame
+        result = pd.DataFrame(self.neighbours(player, k, team, position, min_minutes),
+                              columns=['Player', 'Team', 'Position', 'Minutes', 'Distance'])
+        result['Minutes'] = result['Minutes'].round().astype('Int64')
+        return result
+
+    def save(self, path=INDEX_PATH):
+        np.savez(path, X=self.X, features=np.array(self.features, dtype=object),
+                 players=self.players.to_records(index=False))
+
+    @classmethod
+    def load(cls, path=INDEX_PATH):
+        data = np.load(path, allow_pickle=True)
+        return cls(data['X'], pd.DataFrame.from_records(data['players']), list(data['features']))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Find players with the most similar stat profile')
+    sub = parser.add_subparsers(dest='command', required=True)
+    build = sub.add_parser('build')
+    build.add_argument('--input', default='results.csv')
+    build.add_argument('--index', default=INDEX_PATH)
+    query = sub.add_parser('query')
+    query.add_argument('player')
+    query.add_argument('-k', type=int, default=10)
+    query.add_argument('--team', help='disambiguate players sharing a name')
+    query.add_argument('--position', help='e.g. DF, MF, FW, GK')
+    query.add_argument('--min-minutes', type=float)
+    query.add_argument('--index', default=INDEX_PATH)
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        index = SimilarityIndex.build(args.input)
+        index.save(args.index)
+        print(f"Indexed {len(index.X)} players x {len(index.features)} features into {args.index}")
+    else:
+        index = SimilarityIndex.load(args.index)
+        try:
+            similar = index.similar(args.player, args.k, args.team, args.position, args.min_minutes)
+        except KeyError as e:
+            suggestions = index.close_names(args.player)
+            hint = f" Did you mean: {', '.join(suggestions)}?" if suggestions else ''
+            raise SystemExit(f"{e.args[0]}.{hint}")
+        print(similar.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,28 +1,28 @@
 from typing import Union
-import time
 import logging
 import os
 import concurrent.futures
 import pandas as pd
-import csv
 import warnings
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options
-from bs4 import BeautifulSoup
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
+import argparse
 from fuzzywuzzy import fuzz
-from pprint import pprint
+import sys
+from driver_pool import DriverPool, MAX_PAGES_PER_DRIVER
+from http_fetch import make_fetcher, fetch_profile, fetch_listing, parse_profile, parse_listing
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'I'))
+from loader import load_players
+from telemetry import metrics, export
 warnings.filterwarnings("ignore")
 
 logging.getLogger('urllib3').setLevel(logging.ERROR)
 logging.getLogger('selenium').setLevel(logging.ERROR)
 
-PAGE_URL = "https://www.footballtransfers.com/us/values/players/most-valuable-soccer-players/playing-in-uk-premier-league/{page_idx}"
+BASE_URL = "https://www.footballtransfers.com"
+PAGE_URL = "{base_url}/us/values/players/most-valuable-soccer-players/playing-in-uk-premier-league/{page_idx}"
 START_PAGE = 1
 NUMBER_OF_PAGES = 22
 MAX_WORKERS = 10
+POOL_SIZE = 4
 BATCH_SIZE = 2
 FUZZY_THRESHOLD = 90
 manual_name_mapping = {
@@ -40,21 +40,25 @@ manual_name_mapping = {
     'Rasmus Winther Højlund': 'Rasmus Højlund',
     'Victor Kristiansen': 'Victor Bernth Kristiansen'
 }
+# selenium is imported inside the browser functions, so the plain-HTTP path
+# runs without it installed; it is only needed once a page falls back
 def setup_driver():
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
     chrome_options = Options()
     chrome_options.add_argument("--headless=new")
     chrome_options.add_argument("--disable-gpu")
     chrome_options.add_argument("--no-sandbox")
     chrome_options.page_load_strategy = 'eager'
     chrome_options.add_experimental_option("excludeSwitches", ["enable-logging"])
-    return webdriver.Chrome(options=chrome_options)
+    with metrics.timer('driver_start'):
+        return webdriver.Chrome(options=chrome_options)
 
 def extract_players_from_csv(input_csv='results.csv', output_csv='IV/result_final.csv'):
-    df = pd.read_csv(input_csv) 
-    df['Minutes'] = df['Minutes'].astype(str).str.replace(",", "").astype(float)
+    df = load_players(input_csv)
     df = df[df['Minutes'] >= 900]
     selected_columns = ['Player', 'Nation', 'Team', 'Position', 'Age']
-    df_filtered = df[selected_columns].copy()
+    df_filtered = df[selected_columns].fillna('N/a')
     df_filtered['Transfer Fee'] = None
     df_filtered.to_csv(output_csv, index=False, encoding='utf-8')
     print(f"Saved {len(df_filtered)} eligible players to {output_csv}")
@@ -73,6 +77,9 @@ def is_name_match(crawled_name, existing_names):
 def check_and_get_player_data(player_url: str, local_driver=None) -> Union[bool, dict]:
     if not local_driver:
         return False
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
 
     driver = local_driver
     try:
@@ -86,93 +93,73 @@ def check_and_get_player_data(player_url: str, local_driver=None) -> Union[bool,
             print(f"Timeout waiting for player profile page: {player_url}")
             return False
 
-        soup = BeautifulSoup(driver.page_source, "html.parser")
-        player_data = {
-            "name": None,
-            "value": None
-        }
-
-        try:
-            name_element = soup.find("h1", class_="h1-medium")
-            if name_element:
-                player_data["name"] = name_element.text.strip()
-        except:
-            pass
-
-        try:
-            value_element = soup.find("div", class_="player-value-large")
-            if value_element:
-                value_tag = value_element.find("span", class_="player-tag")
-                if value_tag:
-                    player_data["value"] = value_tag.text.strip()
-        except:
-            pass
-
-        return player_data if player_data["name"] else False
+        return parse_profile(driver.page_source) or False
 
     except Exception as e:
         print(f"Error extracting player data from {player_url}: {str(e)}")
         return False
 
-def process_player(player_url):
-    local_driver = setup_driver()
+def process_player(player_url, pool, fetcher=None):
     try:
         print(f'Processing player: {player_url}')
-        result = check_and_get_player_data(player_url, local_driver)
+        if fetcher is not None:
+            with metrics.timer('page', kind='profile', source='http'):
+                result = fetch_profile(fetcher, player_url)
+            # Both the name and the value must be in the served HTML
+            if result and result["value"]:
+                metrics.inc('pages', kind='profile', result='ok', source='http')
+                return result
+            metrics.inc('http_fallbacks', kind='profile')
+        with pool.driver() as local_driver:
+            with metrics.timer('page', kind='profile', source='browser'):
+                result = check_and_get_player_data(player_url, local_driver)
+        metrics.inc('pages', kind='profile', result='ok' if result else 'failed', source='browser')
         return result
     except Exception as e:
         print(f"Error processing player {player_url}: {str(e)}")
+        metrics.inc('pages', kind='profile', result='error')
         return False
-    finally:
-        local_driver.quit()
 
-def get_player_urls_from_page(page_idx):
-    driver = setup_driver()
-    player_urls = []
+def get_player_urls_from_page(page_idx, base_url, pool, fetcher=None):
+    url = PAGE_URL.format(base_url=base_url, page_idx=page_idx)
     try:
-        url = PAGE_URL.format(page_idx=page_idx)
-        print(f"Accessing page: {url}")
-        driver.get(url)
+        player_urls = []
+        if fetcher is not None:
+            with metrics.timer('page', kind='listing', source='http'):
+                player_urls = fetch_listing(fetcher, url, base_url)
+            if not player_urls:
+                metrics.inc('http_fallbacks', kind='listing')
+        if not player_urls:
+            player_urls = get_player_urls_with_browser(url, page_idx, base_url, pool)
+        print(f"Found {len(player_urls)} players on page {page_idx}")
+        metrics.inc('player_urls', len(player_urls), page=page_idx)
+        return player_urls
+
+    except Exception as e:
+        print(f"Error processing page {page_idx}: {str(e)}")
+        return []
 
-        time.sleep(3)
+def get_player_urls_with_browser(url, page_idx, base_url, pool):
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.common.exceptions import TimeoutException
+    with pool.driver() as driver:
+        print(f"Accessing page: {url}")
+        with metrics.timer('page', kind='listing', source='browser'):
+            driver.get(url)
         driver.execute_script("window.scrollBy(0, 500)")
-        time.sleep(2)
 
+        # Wait for the player links themselves instead of sleeping a fixed 5 seconds
         try:
-            WebDriverWait(driver, 20).until(
-                EC.presence_of_element_located((By.ID, "player-table-body"))
-            )
-        except:
+            with metrics.timer('wait', kind='listing'):
+                WebDriverWait(driver, 20).until(
+                    EC.presence_of_element_located((By.CSS_SELECTOR, "#player-table-body tr div.text a"))
+                )
+        except TimeoutException:
             print(f"Timeout waiting for player table on page {page_idx}")
             return []
-
-        soup = BeautifulSoup(driver.find_element(By.ID, "player-table-body").get_attribute("innerHTML"), "html.parser")
-        player_elements = soup.find_all("tr")
-        print(f"Found {len(player_elements)} players on page {page_idx}")
-
-        for element in player_elements:
-            try:
-                div_text = element.find("div", class_="text")
-                if div_text:
-                    a_tag = div_text.find("a")
-                    if a_tag and "href" in a_tag.attrs:
-                        player_url = a_tag["href"]
-                        player_urls.append(player_url)
-                    else:
-                        print("Anchor tag or href not found.")
-                else:
-                    print("Div with class 'text' not found.")
-            except Exception as e:
-                print(f"Error extracting player URL: {str(e)}")
-
-        player_urls = list(set(player_urls))
-        return player_urls
-
-    except Exception as e:
-        print(f"Error processing page {page_idx}: {str(e)}")
-        return []
-    finally:
-        driver.quit()
+        return parse_listing(driver.page_source, base_url)
 
 update_count = 0 
 def save_progress(player_data_list, filename='result_final.csv'):
@@ -189,29 +176,45 @@ def save_progress(player_data_list, filename='result_final.csv'):
                         if pd.isna(row["Transfer Fee"]) or row["Transfer Fee"] != player["value"]:
                             df.at[idx, "Transfer Fee"] = player["value"]
                             update_count += 1
+                            metrics.inc('players_updated')
                         break
             for player in player_data_list:
                 if row["Player"].strip().lower() == player["name"].strip().lower():
                     if pd.isna(row["Transfer Fee"]) or row["Transfer Fee"] != player["value"]:
                         df.at[idx, "Transfer Fee"] = player["value"]
                         update_count += 1
+                        metrics.inc('players_updated')
                     break
         df.to_csv(filename, index=False, encoding='utf-8')
         print(f"Total updated players: {update_count} in {filename}")
 
     except Exception as e:
         print(f"Error saving to CSV: {str(e)}")
-def process_all_players():
+def process_all_players(base_url=BASE_URL, pool_size=POOL_SIZE, max_pages=MAX_PAGES_PER_DRIVER, http=True):
+    # One pool of browsers for the whole crawl; workers beyond pool_size
+    # queue for a free driver instead of starting their own. Browsers are
+    # only started when a page needs the Selenium fallback.
+    fetcher = make_fetcher(MAX_WORKERS) if http else None
+    try:
+        with DriverPool(setup_driver, pool_size, max_pages) as pool:
+            crawl_with_pool(pool, base_url, fetcher)
+    finally:
+        if fetcher is not None:
+            fetcher.close()
+
+def crawl_with_pool(pool, base_url, fetcher=None):
+    pages = range(START_PAGE, START_PAGE + NUMBER_OF_PAGES)
     all_player_urls = []
-    for page_idx in range(START_PAGE, START_PAGE + NUMBER_OF_PAGES):
-        page_urls = get_player_urls_from_page(page_idx)
-        all_player_urls.extend(page_urls)
+    workers = MAX_WORKERS if fetcher is not None else pool.size
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        for page_urls in executor.map(lambda page_idx: get_player_urls_from_page(page_idx, base_url, pool, fetcher), pages):
+            all_player_urls.extend(page_urls)
 
     print(f"Total players to process: {len(all_player_urls)}")
 
     try:
         with concurrent.futures.ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-            futures = {executor.submit(process_player, url): url for url in all_player_urls}
+            futures = {executor.submit(process_player, url, pool, fetcher): url for url in all_player_urls}
             player_data_list = []
 
             for future in concurrent.futures.as_completed(futures):
@@ -229,7 +232,16 @@ def process_all_players():
         print(f"Error in main execution: {str(e)}")
         
 def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--base-url', default=BASE_URL, help='e.g. a local fixture_server.py')
+    parser.add_argument('--drivers', type=int, default=POOL_SIZE, help='Chrome instances kept alive')
+    parser.add_argument('--max-pages', type=int, default=MAX_PAGES_PER_DRIVER,
+                        help='pages served before a driver is restarted')
+    parser.add_argument('--browser-only', action='store_true', help='skip the plain-HTTP fast path')
+    args = parser.parse_args()
+
     extract_players_from_csv('results.csv', 'result_final.csv')
-    process_all_players()
+    process_all_players(args.base_url.rstrip('/'), args.drivers, args.max_pages, not args.browser_only)
+    export('.', prefix='transfer_crawl')
 if __name__ == "__main__":
     main()
@@ -0,0 +1,106 @@
+import os
+import sys
+import threading
+from contextlib import contextmanager
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'I'))
+from telemetry import metrics
+
+# Headless Chrome takes seconds and a few hundred MB to start, so the crawl
+# keeps a fixed number of browsers alive and hands them out to the worker
+# threads instead of starting one per page.
+MAX_PAGES_PER_DRIVER = 50
+
+
+class DriverPool:
+    # idle holds (driver, pages served) ready for checkout; created counts
+    # every live browser, idle or checked out. Both are guarded by one
+    # Condition so that a checkin *or* a discard wakes a waiting worker.
+    def __init__(self, make_driver, size=4, max_pages=MAX_PAGES_PER_DRIVER):
+        self.make_driver = make_driver
+        self.size = size
+        self.max_pages = max_pages
+        self.idle = []
+        self.created = 0
+        self.available = threading.Condition()
+        self.closed = False
+
+    def healthy(self, driver):
+        # A crashed or disconnected browser raises on any command; a dead
+        # chromedriver raises urllib3 errors rather than WebDriverException
+        try:
+            driver.current_url
+            return True
+        except Exception:
+            return False
+
+    def release_slot(self):
+        with self.available:
+            self.created -= 1
+            self.available.notify()
+
+    def discard(self, driver, reason):
+        metrics.inc('drivers_recycled', reason=reason)
+        try:
+            driver.quit()
+        except Exception:
+            pass
+        self.release_slot()
+
+    def checkout(self):
+        # (driver, pages served) from the idle list, starting a new browser
+        # while fewer than size exist, otherwise waiting until a driver is
+        # checked back in or discarded
+        while True:
+            with self.available:
+                with metrics.timer('driver_wait'):
+                    while not self.idle and self.created >= self.size:
+                        self.available.wait()
+                if self.idle:
+                    driver, pages = self.idle.pop()
+                else:
+                    self.created += 1
+                    driver, pages = None, 0
+            if driver is None:
+                try:
+                    return self.make_driver(), 0
+                except BaseException:
+                    self.release_slot()
+                    raise
+            if self.healthy(driver):
+                return driver, pages
+            self.discard(driver, 'unhealthy')
+
+    def checkin(self, driver, pages):
+        if self.closed:
+            self.discard(driver, 'closed')
+        elif pages >= self.max_pages:
+            self.discard(driver, 'max_pages')
+        else:
+            with self.available:
+                self.idle.append((driver, pages))
+                self.available.notify()
+
+    @contextmanager
+    def driver(self):
+        driver, pages = self.checkout()
+        try:
+            yield driver
+        except BaseException:
+            # The browser may be in any state; do not hand it to another worker
+            self.discard(driver, 'error')
+            raise
+        self.checkin(driver, pages + 1)
+
+    def close(self):
+        with self.available:
+            self.closed = True
+            idle, self.idle = self.idle, []
+        for driver, _ in idle:
+            self.discard(driver, 'closed')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
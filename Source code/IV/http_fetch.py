@@ -0,0 +1,98 @@
+import argparse
+import os
+import sys
+from urllib.parse import urljoin, urlsplit
+
+import requests
+from bs4 import BeautifulSoup
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'I'))
+from fetcher import Fetcher
+
+# Plain-HTTP path for the footballtransfers crawl. The name and the value
+# are in the server-rendered HTML, so a GET plus a parse replaces a Chrome
+# page load; IVpart1 only falls back to Selenium when the parse comes back
+# empty (page rendered by JavaScript, markup changed, request failed).
+
+# footballtransfers tolerates far more than fbref's 10 requests a minute
+HTTP_RATE = 5
+HTTP_BURST = 10
+
+
+def rebase_url(href, base_url):
+    # Point absolute or relative profile links at base_url (e.g. a local fixture server)
+    parts = urlsplit(urljoin(base_url + '/', href))
+    return base_url + parts.path + ('?' + parts.query if parts.query else '')
+
+
+def parse_profile(html):
+    # {"name", "value"} from a player profile page, or None without a name
+    soup = BeautifulSoup(html, "lxml")
+    name_element = soup.select_one("h1.h1-medium")
+    if name_element is None or not name_element.get_text(strip=True):
+        return None
+    value_tag = soup.select_one("div.player-value-large span.player-tag")
+    return {
+        "name": name_element.get_text(strip=True),
+        "value": value_tag.get_text(strip=True) if value_tag else None
+    }
+
+
+def parse_listing(html, base_url):
+    # Unique profile URLs from a "most valuable players" listing page, in page order
+    soup = BeautifulSoup(html, "lxml")
+    urls = []
+    for a_tag in soup.select("#player-table-body tr div.text a[href]"):
+        url = rebase_url(a_tag["href"], base_url)
+        if url not in urls:
+            urls.append(url)
+    return urls
+
+
+def make_fetcher(pool_size=10):
+    return Fetcher(rate=HTTP_RATE, burst=HTTP_BURST, pool_size=pool_size)
+
+
+def get_page(fetcher, url):
+    # Response body, or None on any request failure so the caller falls back
+    try:
+        response = fetcher.get(url)
+    except requests.RequestException as e:
+        print(f"HTTP fetch failed for {url}: {str(e)}")
+        return None
+    if response is None or response.status_code != 200:
+        return None
+    return response.content
+
+
+def fetch_profile(fetcher, url):
+    content = get_page(fetcher, url)
+    return parse_profile(content) if content is not None else None
+
+
+def fetch_listing(fetcher, url, base_url):
+    content = get_page(fetcher, url)
+    return parse_listing(content, base_url) if content is not None else []
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Fetch footballtransfers pages over plain HTTP and print what parses')
+    parser.add_argument('urls', nargs='+', help='profile URLs, or listing URLs with --listing')
+    parser.add_argument('--listing', action='store_true')
+    args = parser.parse_args()
+
+    fetcher = make_fetcher()
+    try:
+        for url in args.urls:
+            if args.listing:
+                base = '{0.scheme}://{0.netloc}'.format(urlsplit(url))
+                for player_url in fetch_listing(fetcher, url, base):
+                    print(player_url)
+            else:
+                print(url, fetch_profile(fetcher, url))
+    finally:
+        fetcher.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -6,7 +6,10 @@ from sklearn.preprocessing import StandardScaler
 from sklearn.metrics import mean_squared_error, r2_score
 import matplotlib.pyplot as plt
 import seaborn as sns
-import re
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'II'))
+from cleaning import clean_players
 
 # Load the dataset
 print("Loading the dataset...")
@@ -27,9 +30,9 @@ print("\nPreprocessing data...")
 # Clean the 'Transfer Fee' column (remove € symbol and convert to float)
 df['Transfer Fee'] = df['Transfer Fee'].str.replace('€', '').str.replace('M', '').astype(float)
 
-# Handle Age column (format like "26-129" where 26 is years and 129 is days)
-# Extract just the years part for simplicity
-df['Age'] = df['Age'].apply(lambda x: int(x.split('-')[0]) if isinstance(x, str) else x)
+# Replace 'N/a' and convert the scraped stat columns to numbers.
+# Age is "26-129" (years-days); keep just the years part for simplicity
+df = clean_players(df, age='whole_years')
 
 # Keep only the columns we need for modeling
 # First, identify which columns are likely to be numeric
@@ -37,20 +40,9 @@ print("\nIdentifying numeric columns...")
 numeric_columns = ['Age', 'Transfer Fee']  # Start with columns we know are numeric
 for col in df.columns:
     if col not in ['Player', 'Nation', 'Team', 'Position', 'Age', 'Transfer Fee']:
-        # Try to convert a sample to check if it's numeric
-        try:
-            sample = df[col].iloc[0]
-            if isinstance(sample, str):
-                if sample == 'N/a':
-                    # This is likely a numeric column with missing values
-                    numeric_columns.append(col)
-                elif re.match(r'^[-+]?\d*\.?\d+$', sample.replace(',', '')):
-                    # This is likely a numeric column
-                    numeric_columns.append(col)
-            else:
-                # If it's not a string, it's likely already numeric
-                numeric_columns.append(col)
-        except:
+        if pd.api.types.is_numeric_dtype(df[col]):
+            numeric_columns.append(col)
+        else:
             print(f"Skipping column: {col}")
 
 print(f"Found {len(numeric_columns)} potentially numeric columns")
@@ -59,17 +51,6 @@ print(f"Found {len(numeric_columns)} potentially numeric columns")
 print("\nCreating a clean dataframe with only numeric columns...")
 model_df = df[numeric_columns].copy()
 
-# Replace 'N/a' with NaN
-model_df.replace('N/a', np.nan, inplace=True)
-
-# Convert all columns to numeric
-for col in model_df.columns:
-    if col not in ['Player', 'Nation', 'Team', 'Position']:
-        try:
-            model_df[col] = pd.to_numeric(model_df[col], errors='coerce')
-        except Exception as e:
-            print(f"Error converting {col} to numeric: {e}")
-
 # Check if we have any remaining non-numeric columns
 print("\nChecking for non-numeric columns...")
 for col in model_df.columns:
@@ -79,7 +60,7 @@ for col in model_df.columns:
         model_df = model_df.drop(columns=[col])
 
 # Fill NaN values with median (more robust than mean)
-model_df = model_df.fillna(model_df.median())
+model_df = model_df.fillna(model_df.median()).astype(float)
 
 # Print some statistics about the target variable
 print("\nTransfer Fee statistics:")
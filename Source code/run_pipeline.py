@@ -0,0 +1,272 @@
+import argparse
+import ast
+import hashlib
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+# Runs the I -> II -> III -> IV scripts from the folders they expect, skipping
+# every stage whose inputs (scripts included) hash the same as last time.
+# Paths below are relative to this file's folder ("Source code").
+ROOT = os.path.dirname(os.path.abspath(__file__))
+STATE_FILE = os.path.join(ROOT, '.pipeline_state.json')
+PYTHON = sys.executable
+
+
+class Stage:
+    def __init__(self, name, inputs, outputs, cmd=None, action=None, cwd='.', stdout=None, manual=False):
+        # cmd runs as a subprocess in cwd; action is an in-process callable.
+        # stdout, when set, is where the command's output is kept (and is
+        # itself an output). manual stages (network scrapes) only run when
+        # named on the command line.
+        self.name = name
+        self.inputs = inputs
+        self.outputs = outputs + ([stdout] if stdout else [])
+        self.cmd = cmd
+        self.action = action
+        self.cwd = cwd
+        self.stdout = stdout
+        self.manual = manual
+
+
+def copy_file(src, dst):
+    def action():
+        shutil.copyfile(os.path.join(ROOT, src), os.path.join(ROOT, dst))
+    return action
+
+
+STAGES = [
+    Stage('scrape', ['I/I.py', 'I/schema.py', 'I/extractor.py', 'I/fetcher.py', 'I/pipeline.py'],
+          ['I/results.csv'], cmd=[PYTHON, 'I/I.py'], manual=True),
+    Stage('top3', ['I/results.csv', 'II/IIpart1.py', 'II/topk.py', 'II/cleaning.py'],
+          ['II/top3.txt'], cmd=[PYTHON, 'II/IIpart1.py']),
+    Stage('aggregates', ['I/results.csv', 'II/IIpart2.py', 'II/cleaning.py'],
+          ['II/results2.csv'], cmd=[PYTHON, 'II/IIpart2.py']),
+    Stage('histograms', ['I/results.csv', 'II/IIpart3.py', 'II/cleaning.py'],
+          ['II/Histogram img/render_manifest.json'], cmd=[PYTHON, 'II/IIpart3.py']),
+    Stage('ranking', ['I/results.csv', 'II/IIpart4.py', 'II/IIpart2.py', 'II/ranking.py', 'II/cleaning.py', 'I/schema.py'],
+          [], cmd=[PYTHON, 'II/IIpart4.py'], stdout='II/ranking.txt'),
+    Stage('copy-III', ['I/results.csv'], ['III/results.csv'], action=copy_file('I/results.csv', 'III/results.csv')),
+    Stage('copy-IV', ['I/results.csv'], ['IV/results.csv'], action=copy_file('I/results.csv', 'IV/results.csv')),
+    Stage('clustering', ['III/results.csv', 'III/III.ipynb'],
+          ['III/players_clustered.csv', 'III/K-Means.png', 'III/PCA.png'],
+          cmd=[PYTHON, '-m', 'jupyter', 'nbconvert', '--to', 'notebook', '--execute',
+               '--output', 'III.executed.ipynb', 'III.ipynb'], cwd='III'),
+    Stage('transfers', ['IV/results.csv', 'IV/IVpart1.py'], ['IV/result_final.csv'],
+          cmd=[PYTHON, 'IVpart1.py'], cwd='IV', manual=True),
+    Stage('merge-fees', ['IV/results.csv', 'IV/result_final.csv', 'IV/process_data.py'],
+          ['IV/merged_players_with_fees.csv'], cmd=[PYTHON, 'process_data.py'], cwd='IV'),
+    Stage('train', ['IV/merged_players_with_fees.csv', 'IV/train_lightgbm_model.py', 'II/cleaning.py'],
+          ['IV/lightgbm_model.pkl', 'IV/top10_scaler.pkl', 'IV/top10_features.pkl', 'IV/feature_importance.png'],
+          cmd=[PYTHON, 'train_lightgbm_model.py'], cwd='IV'),
+]
+
+
+def local_imports(rel):
+    # Repo modules imported by a script: siblings, plus modules in folders it
+    # adds with sys.path.append(os.path.join(..., '..', 'X'))
+    path = os.path.join(ROOT, rel)
+    with open(path, encoding='utf-8') as f:
+        source = f.read()
+    folder = os.path.dirname(rel)
+    search = [folder] + [os.path.join(os.path.dirname(folder), name)
+                         for name in re.findall(r"'\.\.', '(\w+)'", source)]
+    names = set()
+    for node in ast.walk(ast.parse(source)):
+        if isinstance(node, ast.Import):
+            names.update(alias.name.split('.')[0] for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            names.add(node.module.split('.')[0])
+    found = []
+    for name in sorted(names):
+        for folder in search:
+            candidate = os.path.normpath(os.path.join(folder, name + '.py')).replace(os.sep, '/')
+            if os.path.exists(os.path.join(ROOT, candidate)):
+                found.append(candidate)
+                break
+    return found
+
+
+def import_closure(inputs):
+    # inputs plus every repo module their scripts import, transitively, so
+    # editing e.g. I/schema.py invalidates every stage that uses it
+    closure, pending = list(inputs), [rel for rel in inputs if rel.endswith('.py')]
+    while pending:
+        rel = pending.pop()
+        if not os.path.exists(os.path.join(ROOT, rel)):
+            continue
+        for module in local_imports(rel):
+            if module not in closure:
+                closure.append(module)
+                pending.append(module)
+    return closure
+
+
+def file_digest(rel, cache):
+    # Content hash, reused while size and mtime are unchanged
+    path = os.path.join(ROOT, rel)
+    st = os.stat(path)
+    key = [st.st_size, st.st_mtime_ns]
+    cached = cache.get(rel)
+    if cached and cached[:2] == key:
+        return cached[2]
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    cache[rel] = key + [digest.hexdigest()]
+    return digest.hexdigest()
+
+
+def stage_key(stage, file_cache):
+    # Hash of the command and of every input's content; None if one is missing
+    digest = hashlib.sha256(json.dumps([stage.cmd, stage.cwd, stage.stdout]).encode())
+    for rel in import_closure(stage.inputs):
+        if not os.path.exists(os.path.join(ROOT, rel)):
+            return None
+        digest.update(rel.encode() + b'\0' + file_digest(rel, file_cache).encode())
+    return digest.hexdigest()
+
+
+def load_state(path=STATE_FILE):
+    if not os.path.exists(path):
+        return {'stages': {}, 'files': {}}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_state(state, path=STATE_FILE):
+    tmp = path + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def dependencies(stages):
+    # A stage depends on whichever stages produce one of its inputs
+    producer = {out: stage.name for stage in stages for out in stage.outputs}
+    return {stage.name: {producer[rel] for rel in stage.inputs if rel in producer and producer[rel] != stage.name}
+            for stage in stages}
+
+
+def select(stages, targets):
+    # Named targets plus everything upstream of them that is not manual;
+    # with no targets, every non-manual stage
+    by_name = {stage.name: stage for stage in stages}
+    if not targets:
+        return [stage for stage in stages if not stage.manual]
+    deps = dependencies(stages)
+    chosen, todo = set(), list(targets)
+    while todo:
+        name = todo.pop()
+        if name not in by_name:
+            raise SystemExit(f"Unknown stage: {name}")
+        if name in chosen:
+            continue
+        chosen.add(name)
+        todo.extend(dep for dep in deps[name] if not by_name[dep].manual or dep in targets)
+    return [stage for stage in stages if stage.name in chosen]
+
+
+def run_stage(stage):
+    start = time.perf_counter()
+    if stage.action is not None:
+        stage.action()
+    else:
+        out = None
+        if stage.stdout:
+            out = open(os.path.join(ROOT, stage.stdout), 'w', encoding='utf-8')
+        try:
+            subprocess.run(stage.cmd, cwd=os.path.join(ROOT, stage.cwd), stdout=out, check=True)
+        finally:
+            if out:
+                out.close()
+    return time.perf_counter() - start
+
+
+def run(stages, state, force=False, jobs=4, dry_run=False):
+    deps = dependencies(stages)
+    names = {stage.name for stage in stages}
+    pending = {stage.name: stage for stage in stages}
+    done, failed = set(), set()
+    running = {}
+
+    def ready(stage):
+        return all(dep in done or dep not in names for dep in deps[stage.name])
+
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        while pending or running:
+            for name, stage in list(pending.items()):
+                if any(dep in failed for dep in deps[name]):
+                    print(f"[skip] {name}: upstream failed")
+                    failed.add(name)
+                    del pending[name]
+                elif ready(stage):
+                    del pending[name]
+                    # Inputs are final once every upstream stage is done
+                    key = stage_key(stage, state['files'])
+                    outputs_present = all(os.path.exists(os.path.join(ROOT, rel)) for rel in stage.outputs)
+                    if key is None:
+                        print(f"[fail] {name}: missing input")
+                        failed.add(name)
+                    elif not force and state['stages'].get(name) == key and outputs_present:
+                        print(f"[cached] {name}")
+                        done.add(name)
+                    elif dry_run:
+                        print(f"[would run] {name}")
+                        done.add(name)
+                    else:
+                        print(f"[run] {name}")
+                        running[pool.submit(run_stage, stage)] = (stage, key)
+            if not running:
+                if pending:
+                    raise SystemExit(f"Stages waiting on nothing: {', '.join(pending)}")
+                break
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                stage, key = running.pop(future)
+                try:
+                    seconds = future.result()
+                except Exception as e:
+                    print(f"[fail] {stage.name}: {e}")
+                    failed.add(stage.name)
+                    state['stages'].pop(stage.name, None)
+                    continue
+                print(f"[done] {stage.name} in {seconds:.1f}s")
+                done.add(stage.name)
+                state['stages'][stage.name] = key
+                if not dry_run:
+                    save_state(state)
+    return failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the I -> II -> III -> IV stages, skipping unchanged ones')
+    parser.add_argument('targets', nargs='*', help='stages to bring up to date (default: every non-manual stage)')
+    parser.add_argument('--force', action='store_true', help='rerun stages even if their inputs are unchanged')
+    parser.add_argument('--jobs', type=int, default=4, help='stages run at the same time')
+    parser.add_argument('--dry-run', action='store_true')
+    parser.add_argument('--list', action='store_true', help='show the stages and exit')
+    args = parser.parse_args()
+
+    if args.list:
+        deps = dependencies(STAGES)
+        for stage in STAGES:
+            after = ', '.join(sorted(deps[stage.name])) or '-'
+            print(f"{stage.name:<12} after: {after:<28} {'(manual)' if stage.manual else ''}")
+        return
+
+    state = load_state()
+    failed = run(select(STAGES, args.targets), state, args.force, args.jobs, args.dry_run)
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,23 @@
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pandas as pd
+
+III = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'III')
+sys.path.append(III)
+from clustering import PlayerClusters
+
+
+def test_model_saved_by_cli_loads_from_another_module(tmp_path):
+    model_path = str(tmp_path / 'player_clusters.npz')
+    output = str(tmp_path / 'players_clustered.csv')
+    subprocess.run([sys.executable, 'clustering.py', 'fit', '-k', '3', '--input', 'results.csv',
+                    '--output', output, '--model', model_path], cwd=III, check=True, capture_output=True)
+
+    model = PlayerClusters.load(model_path)
+    clustered = pd.read_csv(output)
+    assert model.k == 3
+    np.testing.assert_array_equal(model.predict(clustered), clustered['Cluster'].to_numpy())
+    assert model.predict_one(clustered.iloc[0].to_dict()) == clustered['Cluster'].iloc[0]
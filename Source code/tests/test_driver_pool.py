@@ -0,0 +1,66 @@
+import os
+import sys
+import threading
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'IV'))
+from driver_pool import DriverPool
+
+
+class StubDriver:
+    def __init__(self):
+        self.closed = False
+
+    @property
+    def current_url(self):
+        if self.closed:
+            raise ConnectionError('driver quit')
+        return 'about:blank'
+
+    def quit(self):
+        self.closed = True
+
+
+def run_workers(pool, workers, pages_each, fail_every=0):
+    errors = []
+
+    def work():
+        for page in range(pages_each):
+            try:
+                with pool.driver():
+                    # Hold the driver long enough for the other workers to queue
+                    time.sleep(0.005)
+                    if fail_every and page % fail_every == 0:
+                        raise ValueError('parse error')
+            except ValueError:
+                pass
+            except Exception as e:
+                errors.append(e)
+
+    threads = [threading.Thread(target=work, daemon=True) for _ in range(workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=5)
+    return [thread for thread in threads if thread.is_alive()], errors
+
+
+def test_waiter_wakes_when_driver_is_recycled():
+    # size=1, max_pages=1: every page discards the only driver, so the other
+    # worker must be woken by the discard rather than by a checkin
+    drivers = []
+    pool = DriverPool(lambda: drivers.append(StubDriver()) or drivers[-1], size=1, max_pages=1)
+    stuck, errors = run_workers(pool, workers=2, pages_each=5)
+    assert not stuck and not errors
+    assert len(drivers) == 10
+    assert pool.created == 0
+
+
+def test_waiter_wakes_when_driver_is_discarded_on_error():
+    drivers = []
+    pool = DriverPool(lambda: drivers.append(StubDriver()) or drivers[-1], size=2, max_pages=3)
+    stuck, errors = run_workers(pool, workers=6, pages_each=20, fail_every=4)
+    pool.close()
+    assert not stuck and not errors
+    assert pool.created == 0
+    assert all(driver.closed for driver in drivers)
@@ -0,0 +1,23 @@
+import os
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'II'))
+from IIpart3 import grouped_histograms
+
+
+def test_grouped_histograms_match_np_histogram_on_edge_values():
+    # 2-decimal, xG-like values put many points exactly on bin edges
+    rng = np.random.default_rng(0)
+    n_groups, bins = 2000, 20
+    codes = np.concatenate([np.arange(n_groups), rng.integers(n_groups, size=40000)])
+    values = np.round(rng.gamma(1, 0.3, size=(len(codes), 3)), 2)
+    values[codes == 0] = 1.0  # a flat group, widened to lo - 0.5 .. hi + 0.5
+
+    counts, edges = grouped_histograms(values, codes, n_groups, bins)
+    for group in range(n_groups):
+        for stat in range(values.shape[1]):
+            expected, expected_edges = np.histogram(values[codes == group, stat], bins=bins)
+            np.testing.assert_array_equal(counts[group, stat], expected)
+            np.testing.assert_array_equal(edges[group, stat], expected_edges)